@@ -1,12 +1,13 @@
 import asyncio
 from collections import OrderedDict
 
+from tortoise import exceptions as model_exceptions
 from tortoise import fields as model_fields
 from tortoise import transactions
 from tortoise.fields.relational import ForeignKeyFieldInstance
 
 from async_easy_utils.serializer import fields as serializer_fields
-from async_easy_utils.serializer.exceptions import ValidationError
+from async_easy_utils.serializer.exceptions import InvalidSerializer, ValidationError
 from async_easy_utils.serializer.validators import SerializerMetaValidator
 
 
@@ -40,11 +41,46 @@ class SerializerMeta(type):
                     field = field_class(pk=field_name is instance.model._meta.pk_attr)
             else:
                 field = attrs.get(field_name)
+                if isinstance(field, serializer_fields.MethodField) and field.method is None:
+                    field.method = attrs.get(f'get_{field_name}')
 
             if not field.pk:
                 field.read_only = field_name in read_only_fields
             instance.fields[field_name] = field
 
+    @staticmethod
+    def _setup_input_keys(instance):
+        instance.pk_keys = frozenset(
+            field_name for field_name, field in instance.fields.items() if field.pk
+        ) | {instance.model_pk_field_name}
+        instance.read_only_keys = frozenset(
+            field_name for field_name, field in instance.fields.items() if field.read_only
+        ) - instance.pk_keys
+        instance.writable_keys = frozenset(instance.fields.keys()) - instance.read_only_keys - \
+            instance.pk_keys
+        instance.required_keys = instance.writable_keys
+
+    @staticmethod
+    def _compile_input_validator(instance):
+        key_errors = dict.fromkeys(instance.pk_keys, 'primary key, cannot be in input')
+        key_errors.update(dict.fromkeys(instance.read_only_keys, 'field is read only'))
+        writable_keys = instance.writable_keys
+        required_keys = instance.required_keys
+
+        def check_input_keys(data):
+            errors = {}
+            for key in data:
+                if key not in writable_keys:
+                    errors[key] = key_errors.get(key, 'unknown field')
+
+            missing_keys = required_keys.difference(data)
+            if missing_keys:
+                errors.update(dict.fromkeys(missing_keys, 'missing in input'))
+
+            return errors
+
+        return check_input_keys
+
     def __new__(cls, name, bases, attrs, **kwargs):
         instance = super().__new__(cls, name, bases, attrs, **kwargs)
         if not bases:
@@ -56,16 +92,31 @@ class SerializerMeta(type):
         instance.model = meta.model
         instance.model_pk_field_name = instance.model._meta.pk_attr
         cls._setup_fields_from_meta(meta, instance, attrs)
+        cls._setup_input_keys(instance)
+        instance.check_input_keys = staticmethod(cls._compile_input_validator(instance))
+        instance._prefetch_paths = None
+        instance.field_validators = tuple(
+            field_name for field_name in instance.fields.keys()
+            if callable(getattr(instance, f'validate_{field_name}', None))
+        )
+        instance.aggregate_fields = OrderedDict(
+            (field_name, field) for field_name, field in instance.fields.items()
+            if isinstance(field, serializer_fields.AggregateField)
+        )
 
         return instance
 
 
 class Serializer(metaclass=SerializerMeta):
-    def __init__(self, instance=None, data=None):
+    UPSERT_STATEMENT_DIALECTS = ('postgres',)
+    UPSERT_CREATED_COLUMN = '_upsert_created'
+
+    def __init__(self, instance=None, data=None, using_db=None):
         self._validate_input(instance, data)
 
         self._errors = {}
         self._instance = instance
+        self._using_db = using_db
 
         self._data = data
         self._validated_data = {}
@@ -81,62 +132,75 @@ class Serializer(metaclass=SerializerMeta):
         if data and not isinstance(data, dict):
             raise ValidationError(f'{self.__class__.__name__} data is not dict')
 
-    def _check_input_data_for_primary_key(self):
-        if self.model_pk_field_name in self._data.keys():
-            self._errors.update(
-                {self.model_pk_field_name: 'primary key, cannot be in input'}
-            )
+    async def _process_input_data_to_fields_internal_values(self):
+        values = {}
+        for name, value in self._data.items():
+            field = self.fields.get(name)
+            if field.is_db_bound:
+                error = field.check_value(value)
+            else:
+                values[name], error = await field.to_internal_value(value)
 
-    def _check_input_data_for_read_only_values(self):
-        self._errors.update(
-            {
-                field_name: 'field is read only'
-                for field_name in self._data.keys()
-                if self.fields[field_name].read_only
-            }
-        )
+            if error:
+                self._errors[name] = error
 
-    def _check_input_data_for_missing_values(self):
-        self._errors.update(
-            {
-                field_name: 'missing in input'
-                for field_name, field in self.fields.items()
-                if field_name not in self._data.keys() and not field.read_only
-            }
-        )
+        if self._errors:
+            return
 
-    async def _process_input_data_to_fields_internal_values(self):
-        values, errors = zip(
-            *await asyncio.gather(
-                *[
-                    self.fields.get(name).to_internal_value(value)
-                    for name, value in self._data.items()
-                ]
-            )
-        )
-        self._errors.update(
-            {field: error for field, error in zip(self._data.keys(), errors) if error}
+        related_names = [name for name in self._data.keys() if self.fields.get(name).is_db_bound]
+        validator_names = [name for name in self.field_validators if name in self._data.keys()]
+        results = await asyncio.gather(
+            *[self.fields.get(name).to_internal_value(self._data[name]) for name in related_names],
+            *[self._run_field_validator(name) for name in validator_names]
         )
 
+        for name, (value, error) in zip(related_names, results):
+            values[name] = value
+            if error:
+                self._errors[name] = error
+
+        for name, error in zip(validator_names, results[len(related_names):]):
+            if error:
+                self._errors.setdefault(name, error)
+
         if not self._errors:
-            self._set_validated_data(
-                {name: value for name, value in zip(self._data.keys(), values)}
-            )
+            self._set_validated_data({name: values[name] for name in self._data.keys()})
 
-    @transactions.atomic()
-    async def _handle_m2m_data(self):
-        success = True
+    async def _run_field_validator(self, name):
+        try:
+            result = await getattr(self, f'validate_{name}')(self._data[name])
+        except ValidationError as error:
+            return str(error)
+
+        if result is False:
+            return 'validation failed'
+
+        return None
+
+    @classmethod
+    def get_connection_name(cls, using_db=None):
+        if using_db is not None:
+            return using_db.connection_name
+
+        return cls.model._meta.default_connection
+
+    async def _write_m2m_data(self, db, replace=False):
         for attr_name, values in self._instance_related_validated_data.items():
             m2m_attr_manager = getattr(self._instance, attr_name, None)
 
             try:
-                await m2m_attr_manager.add(*values)
+                if replace:
+                    await m2m_attr_manager.clear(using_db=db)
+                await m2m_attr_manager.add(*values, using_db=db)
             except (ValueError, AttributeError):
-                success = False
                 self._errors[attr_name] = f'cannot save with with value/values {values}'
-                break
+                return False
+
+        return True
 
-        return success
+    async def _handle_m2m_data(self):
+        async with transactions.in_transaction(self.get_connection_name(self._using_db)) as db:
+            return await self._write_m2m_data(db)
 
     def _set_validated_data(self, data):
         self._validated_data = data
@@ -151,11 +215,9 @@ class Serializer(metaclass=SerializerMeta):
         if not self._data:
             raise ValidationError('initial data not provided, cannot call is_valid()')
 
-        self._check_input_data_for_primary_key()
-        self._check_input_data_for_missing_values()
-        self._check_input_data_for_read_only_values()
-
-        if self._errors:
+        errors = self.check_input_keys(self._data)
+        if errors:
+            self._errors.update(errors)
             return False
 
         await self._process_input_data_to_fields_internal_values()
@@ -173,7 +235,7 @@ class Serializer(metaclass=SerializerMeta):
 
         try:
             self._instance = self.model(**self._instance_validated_data)
-            await self._instance.save()
+            await self._instance.save(using_db=self._using_db)
         except (ValueError, AttributeError):
             self._instance = None
             self._errors.update({'error': 'cannot save instance'})
@@ -192,6 +254,29 @@ class Serializer(metaclass=SerializerMeta):
 
         return self._instance
 
+    @classmethod
+    async def bulk_save(cls, serializers, using_db=None, fetch_pks=False):
+        for serializer in serializers:
+            serializer._validate_can_perform_write_operation()
+            if serializer._instance_related_validated_data:
+                raise ValidationError('bulk save does not support many to many fields')
+
+        instances = [cls.model(**serializer._instance_validated_data) for serializer in serializers]
+        try:
+            async with transactions.in_transaction(cls.get_connection_name(using_db)) as db:
+                if fetch_pks and cls.model._meta.pk.generated:
+                    for instance in instances:
+                        await instance.save(using_db=db)
+                else:
+                    await cls.model.bulk_create(instances, using_db=db)
+        except (ValueError, AttributeError, model_exceptions.BaseORMException):
+            return None
+
+        for serializer, instance in zip(serializers, instances):
+            serializer._instance = instance
+
+        return instances
+
     async def update(self):
         self._validate_can_perform_write_operation()
 
@@ -203,17 +288,179 @@ class Serializer(metaclass=SerializerMeta):
             return status
 
         try:
-            await self._instance.save()
+            await self._instance.save(using_db=self._using_db)
         except (ValueError, AttributeError):
             self._errors = 'cannot update instance, internal error'
             status = False
 
         return status
 
+    def get_upsert_query(self, instance):
+        meta = self.model._meta
+        columns, values = [], []
+        for field_name, column in meta.fields_db_projection.items():
+            field = meta.fields_map[field_name]
+            columns.append(column)
+            values.append(field.to_db_value(getattr(instance, field_name), instance))
+
+        update_fields = {
+            meta.fields_map[name].source_field if name in meta.fk_fields else name
+            for name in self._instance_validated_data.keys()
+        }
+        update_fields.update(
+            field_name for field_name, field in meta.fields_map.items()
+            if getattr(field, 'auto_now', False)
+        )
+        pk_column = meta.fields_db_projection[meta.pk_attr]
+        update_columns = [
+            column for field_name, column in meta.fields_db_projection.items()
+            if field_name in update_fields
+        ] or [pk_column]
+
+        column_names = ', '.join(f'"{column}"' for column in columns)
+        placeholders = ', '.join(f'${index}' for index in range(1, len(values) + 1))
+        assignments = ', '.join(f'"{column}" = EXCLUDED."{column}"' for column in update_columns)
+        query = (
+            f'INSERT INTO "{meta.db_table}" ({column_names}) '
+            f'VALUES ({placeholders}) ON CONFLICT ("{pk_column}") DO UPDATE SET {assignments} '
+            f'RETURNING *, (xmax = 0) AS "{self.UPSERT_CREATED_COLUMN}"'
+        )
+
+        return query, values
+
+    async def _upsert_statement(self, db, pk):
+        instance = self.model(**{self.model_pk_field_name: pk}, **self._instance_validated_data)
+        _, rows = await db.execute_query(*self.get_upsert_query(instance))
+        row = dict(rows[0])
+        created = row.pop(self.UPSERT_CREATED_COLUMN)
+
+        return self.model._init_from_db(**row), created
+
+    async def _upsert_transactional(self, db, pk, allow_create=True):
+        instance = await self.model.filter(**{self.model_pk_field_name: pk}).using_db(db).first()
+        if instance is None:
+            if not allow_create:
+                raise model_exceptions.DoesNotExist(pk)
+
+            instance = self.model(**{self.model_pk_field_name: pk}, **self._instance_validated_data)
+            try:
+                await instance.save(using_db=db, force_create=True)
+
+                return instance, True
+            except model_exceptions.IntegrityError:
+                instance = await self.model.get(**{self.model_pk_field_name: pk}).using_db(db)
+
+        for attr, value in self._instance_validated_data.items():
+            setattr(instance, attr, value)
+        await instance.save(using_db=db)
+
+        return instance, False
+
+    async def upsert(self, pk):
+        self._validate_can_perform_write_operation()
+
+        try:
+            async with transactions.in_transaction(self.get_connection_name(self._using_db)) as db:
+                pk_generated = self.model._meta.pk.generated
+                if db.capabilities.dialect in self.UPSERT_STATEMENT_DIALECTS and not pk_generated:
+                    self._instance, created = await self._upsert_statement(db, pk)
+                else:
+                    self._instance, created = await self._upsert_transactional(
+                        db, pk, allow_create=not pk_generated
+                    )
+
+                if not await self._write_m2m_data(db, replace=not created):
+                    raise ValueError('cannot save many to many data')
+        except model_exceptions.DoesNotExist:
+            self._instance = None
+            self._errors.update({self.model_pk_field_name: 'objects does not exists'})
+
+            return None
+        except (ValueError, AttributeError, model_exceptions.BaseORMException):
+            self._instance = None
+            self._errors.update({'error': 'cannot upsert instance'})
+
+            return None
+
+        return created
+
     async def delete(self):
         pass
 
-    async def to_dict(self):
+    @classmethod
+    def get_prefetch_paths(cls):
+        if cls._prefetch_paths is not None:
+            return cls._prefetch_paths
+
+        prefetch_paths = []
+        fetch_fields = cls.model._meta.fetch_fields
+        for field_name, field in cls.fields.items():
+            is_nested = isinstance(field, serializer_fields.NestedField)
+            if is_nested and field_name not in fetch_fields:
+                raise InvalidSerializer(
+                    f'{cls.__name__} nested field {field_name} is not model relation'
+                )
+
+            is_relation = field_name in fetch_fields
+            if not (isinstance(field, serializer_fields.RelatedField) and is_relation):
+                continue
+
+            prefetch_paths.append(field_name)
+            if is_nested:
+                prefetch_paths.extend(
+                    f'{field_name}__{path}' for path in field.serializer_class.get_prefetch_paths()
+                )
+
+        cls._prefetch_paths = tuple(prefetch_paths)
+
+        return cls._prefetch_paths
+
+    @classmethod
+    def get_annotations_by_relation(cls):
+        annotations = OrderedDict()
+        for field_name, field in cls.aggregate_fields.items():
+            annotations.setdefault(field.relation, {})[field_name] = field.get_annotation()
+
+        return list(annotations.values())
+
+    @classmethod
+    def get_queryset_annotations(cls):
+        return next(iter(cls.get_annotations_by_relation()), {})
+
+    @classmethod
+    async def _load_missing_aggregates(cls, instances, using_db=None):
+        for annotations in cls.get_annotations_by_relation():
+            if all(hasattr(instance, name) for instance in instances for name in annotations):
+                continue
+
+            queryset = cls.model.filter(
+                **{f'{cls.model_pk_field_name}__in': [instance.pk for instance in instances]}
+            )
+            if using_db is not None:
+                queryset = queryset.using_db(using_db)
+            rows = await queryset.annotate(**annotations).values(
+                cls.model_pk_field_name, *annotations.keys()
+            )
+            rows_by_pk = {row[cls.model_pk_field_name]: row for row in rows}
+
+            for instance in instances:
+                row = rows_by_pk.get(instance.pk, {})
+                for name in annotations:
+                    setattr(instance, name, row.get(name))
+
+    @classmethod
+    async def prefetch(cls, instances, using_db=None):
+        if not instances:
+            return
+
+        prefetch_paths = cls.get_prefetch_paths()
+        if prefetch_paths:
+            await cls.model.fetch_for_list(list(instances), *prefetch_paths, using_db=using_db)
+
+        if cls.aggregate_fields:
+            await cls._load_missing_aggregates(instances, using_db=using_db)
+
+    async def to_row(self):
         if not self._instance:
             raise ValidationError('first call is_valid')
 
@@ -221,10 +468,18 @@ class Serializer(metaclass=SerializerMeta):
             field.to_representation(getattr(self._instance, name, self._instance))
             for name, field in self.fields.items()
         ]
-        values = await asyncio.gather(*tasks)
+
+        return await asyncio.gather(*tasks)
+
+    async def to_dict(self):
+        values = await self.to_row()
 
         return {name: value for name, value in zip(self.fields.keys(), values)}
 
+    @property
+    def instance(self):
+        return self._instance
+
     @property
     def validated_data(self):
         return self._validated_data
@@ -1,13 +1,36 @@
 import ast
+import asyncio
 from datetime import datetime
+from decimal import Decimal
+
+from tortoise import functions
+from tortoise.models import Model
+
 from async_easy_utils.serializer.exceptions import InvalidSerializer
+from async_easy_utils.utils import LRUCache
+
+
+async def get_related_instance(value):
+    if value is None or isinstance(value, Model):
+        return value
+
+    return await value
+
+
+async def get_related_instances(value):
+    return [instance async for instance in value]
 
 
 class SerializerField:
+    is_db_bound = False
+
     def __init__(self, pk=False, read_only=False):
         self._pk = pk
         self._read_only = read_only
 
+    def check_value(self, value):
+        return None
+
     async def to_internal_value(self, value):
         raise NotImplementedError()  # pragma: no cover
 
@@ -45,11 +68,22 @@ class SerializerField:
 
 
 class RelatedField(SerializerField):
+    is_db_bound = True
+
     def __init__(self, queryset=None, many=False, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._queryset = queryset
         self._many = many
 
+    def check_value(self, value):
+        if self._many and not isinstance(value, (list, tuple)):
+            return 'incorrect value, must be list'
+
+        if not self._many and not isinstance(value, (int, str)):
+            return 'incorrect value, must be int or string'
+
+        return None
+
     async def to_internal_value(self, value):
         if self._many:
             db_data = await self._queryset().filter(**{f'{self._slug_field}__in': value})
@@ -78,15 +112,53 @@ class SlugRelatedField(RelatedField):
         super().__init__(*args, **kwargs)
         self._slug_field = slug_field
 
+    @property
+    def slug_field(self):
+        return self._slug_field
+
     async def to_representation(self, value):
         if not self._many:
-            instance = await value.first()
+            instance = await get_related_instance(value)
             return getattr(instance, self._slug_field)
         else:
-            instances = await value.all()
+            instances = await get_related_instances(value)
             return [getattr(instance, self._slug_field) for instance in instances]
 
 
+class NestedField(RelatedField):
+    def __init__(self, serializer_class, many=False, *args, **kwargs):
+        super().__init__(many=many, *args, **kwargs)
+        self._serializer_class = serializer_class
+
+    async def to_internal_value(self, value):
+        return None, 'nested field is read only'
+
+    async def to_representation(self, value):
+        if not self._many:
+            instance = await get_related_instance(value)
+            if instance is None:
+                return None
+
+            return await self._serializer_class(instance=instance).to_dict()
+        else:
+            instances = await get_related_instances(value)
+            return await asyncio.gather(
+                *[self._serializer_class(instance=instance).to_dict() for instance in instances]
+            )
+
+    @property
+    def serializer_class(self):
+        return self._serializer_class
+
+    @property
+    def read_only(self):
+        return True
+
+    @read_only.setter
+    def read_only(self, value):
+        pass
+
+
 class IntegerField(SerializerField):
     async def to_representation(self, value):
         return int(value)
@@ -171,15 +243,116 @@ class JSONField(SerializerField):
 
 
 class MethodField(SerializerField):
-    def __init__(self, method, *args, **kwargs):
+    def __init__(self, method=None, cache_size=0, cache_ttl=None, version_field=None,
+                 *args, **kwargs):
         super().__init__(*args, **kwargs)
+        if cache_size < 0 or (cache_ttl is not None and cache_ttl <= 0):
+            raise InvalidSerializer('method field cache_size and cache_ttl must be positive')
+
         self._method = method
+        self._version_field = version_field
+        self._cache = LRUCache(max_size=cache_size, ttl=cache_ttl) if cache_size else None
 
     def to_internal_value(self, value):
         raise ValueError('method field is read only')
 
+    def _get_cache_key(self, instance):
+        pk = getattr(instance, 'pk', None)
+        if pk is None:
+            return None
+
+        version = getattr(instance, self._version_field) if self._version_field else None
+
+        return instance.__class__, pk, version
+
     async def to_representation(self, instance):
-        return await self._method(self, instance)
+        cache_key = self._get_cache_key(instance) if self._cache is not None else None
+        if cache_key is None:
+            return await self._method(self, instance)
+
+        value = self._cache.get(cache_key)
+        if value is LRUCache.MISSING:
+            value = await self._method(self, instance)
+            self._cache.set(cache_key, value)
+
+        return value
+
+    @property
+    def method(self):
+        return self._method
+
+    @method.setter
+    def method(self, value):
+        self._method = value
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def is_m2m(self):
+        return False
+
+    @property
+    def read_only(self):
+        return True
+
+    @read_only.setter
+    def read_only(self, value):
+        pass
+
+
+class Avg(functions.Avg):
+    populate_field_object = False
+
+
+class AggregateField(SerializerField):
+    FUNCTIONS = {
+        'count': functions.Count,
+        'sum': functions.Sum,
+        'min': functions.Min,
+        'max': functions.Max,
+        'avg': Avg,
+    }
+    ANNOTATION_NAME = 'aggregate_value'
+
+    def __init__(self, function, relation, field=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if function not in self.FUNCTIONS:
+            raise InvalidSerializer(f'aggregate function must be one of {tuple(self.FUNCTIONS)}')
+
+        if function != 'count' and field is None:
+            raise InvalidSerializer(f'aggregate function {function} requires field')
+
+        self._function = function
+        self._relation = relation
+        self._field = field
+
+    def get_annotation(self):
+        if self._field is None:
+            return self.FUNCTIONS[self._function](self._relation)
+
+        return self.FUNCTIONS[self._function](f'{self._relation}__{self._field}')
+
+    async def to_internal_value(self, value):
+        return None, 'aggregate field is read only'
+
+    async def to_representation(self, value):
+        if isinstance(value, Decimal):
+            return float(value)
+
+        if not isinstance(value, Model):
+            return value
+
+        values = await value.__class__.filter(pk=value.pk).annotate(
+            **{self.ANNOTATION_NAME: self.get_annotation()}
+        ).values_list(self.ANNOTATION_NAME, flat=True)
+
+        return next(iter(values), None)
+
+    @property
+    def relation(self):
+        return self._relation
 
     @property
     def is_m2m(self):
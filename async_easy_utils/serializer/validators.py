@@ -3,7 +3,7 @@ from collections.abc import Iterable
 
 from tortoise.models import Model
 
-from async_easy_utils.serializer.fields import RelatedField
+from async_easy_utils.serializer.fields import MethodField, SerializerField
 from async_easy_utils.utils import MetaValidatorMixin
 
 
@@ -67,6 +67,13 @@ class SerializerMetaValidator(MetaValidatorMixin):
                 'was not included to fields'
             )
 
+    def check_declared_method_fields_have_methods(self):
+        for name, attr in self._attrs.items():
+            if isinstance(attr, MethodField) and attr.method is None and \
+                    not callable(self._attrs.get(f'get_{name}')):
+                raise ValueError(f'{self._instance.__name__} method field {name} '
+                                 f'missing get_{name} method')
+
     @property
     def serialized_fields(self):
         return {
@@ -84,7 +91,7 @@ class SerializerMetaValidator(MetaValidatorMixin):
         return {
             name
             for name, attr in self._attrs.items()
-            if issubclass(attr.__class__, RelatedField)
+            if issubclass(attr.__class__, SerializerField)
         }
 
     @property
@@ -108,3 +115,4 @@ class SerializerMetaValidator(MetaValidatorMixin):
         validator.check_if_meta_fields_contains_proper_values()
         validator.check_meta_read_only_fields()
         validator.check_if_all_declared_related_fields_in_meta_fields()
+        validator.check_declared_method_fields_have_methods()
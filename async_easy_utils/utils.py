@@ -1,3 +1,10 @@
+import asyncio
+import contextvars
+import functools
+import time
+from collections import OrderedDict
+
+
 class MetaValidatorMixin:
     @classmethod
     def validate(cls, instance, attrs):
@@ -6,3 +13,65 @@ class MetaValidatorMixin:
         for validator in (getattr(obj, validator_name) for validator_name in dir(obj)
                           if validator_name.startswith('check')):
             validator()
+
+
+class LRUCache:
+    MISSING = object()
+
+    def __init__(self, max_size, ttl=None):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value, expires = self._items.get(key, (self.MISSING, None))
+        if value is not self.MISSING and expires is not None and expires <= time.monotonic():
+            del self._items[key]
+            value = self.MISSING
+
+        if value is self.MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._items.move_to_end(key)
+
+        return value
+
+    def set(self, key, value):
+        expires = None if self._ttl is None else time.monotonic() + self._ttl
+        self._items[key] = (value, expires)
+        self._items.move_to_end(key)
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+async def bounded_map(coroutine_function, items, concurrency):
+    results = [None] * len(items)
+    indexed_items = iter(enumerate(items))
+
+    async def worker():
+        for index, item in indexed_items:
+            results[index] = await coroutine_function(item)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, len(items)))])
+
+    return results
+
+
+async def run_in_executor(executor, func, *args, **kwargs):
+    loop = asyncio.get_event_loop()
+    context = contextvars.copy_context()
+    func = functools.partial(context.run, functools.partial(func, *args, **kwargs))
+
+    return await loop.run_in_executor(executor, func)
@@ -1,15 +1,84 @@
 import asyncio
+import functools
+import json
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from starlette.concurrency import run_in_threadpool
 from starlette.endpoints import HTTPEndpoint
 from starlette.requests import Request
-from starlette.responses import JSONResponse
-from tortoise import exceptions
+from starlette.responses import JSONResponse, Response
+from tortoise import Tortoise, exceptions, transactions
+from tortoise.fields import BinaryField
 
+from async_easy_utils.utils import bounded_map, run_in_executor
+from async_easy_utils.view.admission import AdmissionController
+from async_easy_utils.view.aggregates import QueryAggregator
+from async_easy_utils.view.blobs import BlobResponse, RangeNotSatisfiable, parse_range
+from async_easy_utils.view.coalescer import WriteCoalescer
+from async_easy_utils.view.events import get_model_name
+from async_easy_utils.view.filters import QueryFilter
+from async_easy_utils.view.loaders import InstanceLoader
+from async_easy_utils.view.renderers import (
+    ColumnarJSONRenderer,
+    JSONRenderer,
+    NDJSONRenderer,
+    negotiate_renderer,
+)
+from async_easy_utils.view.responses import StreamingResponse
+from async_easy_utils.view.single_flight import SingleFlight
+from async_easy_utils.view.sync import format_cursor, parse_cursor
 from async_easy_utils.view.validators import ViewMetaValidator
 
 
+DispatchRoute = namedtuple('DispatchRoute', ('name', 'handler', 'is_async'))
+
+
 class ViewMeta(type):
+    @staticmethod
+    def _get_dispatch_table(instance):
+        dispatch_table = {}
+        for action, handler_name in instance.action_mapping.items():
+            request_method, request_type = action.split('-', 1)
+            handler = getattr(instance, handler_name, None)
+            if handler is None or (handler_name == 'upsert' and not instance.allow_upsert):
+                continue
+
+            route = DispatchRoute(
+                name=handler_name,
+                handler=handler,
+                is_async=asyncio.iscoroutinefunction(handler),
+            )
+            dispatch_table[(request_method.upper(), request_type)] = route
+            if request_method == 'get':
+                dispatch_table[('HEAD', request_type)] = route
+
+        return dispatch_table
+
+    @staticmethod
+    def _get_reserved_query_params(instance):
+        reserved_query_params = [
+            *instance.reserved_query_params, instance.format_param, instance.ids_param
+        ]
+        for renderer_class in instance.renderer_classes:
+            reserved_query_params.extend(renderer_class.query_params)
+        if instance.sync_field is not None:
+            reserved_query_params.append(instance.since_param)
+        reserved_query_params.extend(instance.query_aggregator.query_params)
+
+        return tuple(reserved_query_params)
+
+    @staticmethod
+    def _get_blob_field_names(instance):
+        if instance.blob_fields is not None:
+            return frozenset(instance.blob_fields)
+
+        return frozenset(
+            field_name for field_name, field in instance.serializer.model._meta.fields_map.items()
+            if isinstance(field, BinaryField) and field_name not in instance.serializer.fields
+        )
+
     def __new__(cls, name, bases, attrs, **kwargs):
         instance = super().__new__(cls, name, bases, attrs, **kwargs)
         if not bases or HTTPEndpoint in bases:
@@ -19,6 +88,43 @@ class ViewMeta(type):
 
         instance.get_queryset = attrs['get_queryset']
         instance.serializer = attrs['serializer_class']
+        instance.query_aggregator = QueryAggregator(
+            serializer_class=instance.serializer,
+            aggregate_fields=instance.aggregate_fields,
+            group_by_fields=instance.group_by_fields,
+            aggregate_param=instance.aggregate_param,
+            group_by_param=instance.group_by_param,
+        )
+        instance.query_filter = QueryFilter(
+            serializer_class=instance.serializer,
+            filter_fields=instance.filter_fields,
+            ordering_fields=instance.ordering_fields,
+            ordering_param=instance.ordering_param,
+            ignored_params=cls._get_reserved_query_params(instance),
+        )
+        instance.single_flight_group = SingleFlight()
+        instance.instance_loader = InstanceLoader(
+            model=instance.serializer.model,
+            window=instance.instance_loader_window,
+            max_batch_size=instance.instance_loader_max_batch_size,
+        )
+        instance.write_coalescer = WriteCoalescer(
+            serializer_class=instance.serializer,
+            window=instance.write_coalescer_window,
+            max_batch_size=instance.write_coalescer_max_batch_size,
+        )
+        instance.dispatch_table = cls._get_dispatch_table(instance)
+        instance.cancelled_requests = Counter()
+        instance.blob_field_names = cls._get_blob_field_names(instance)
+        instance.read_only_blob_field_names = frozenset(
+            field_name for field_name in instance.blob_field_names
+            if field_name in instance.serializer.read_only_keys
+        )
+        if 'admission_controller' not in attrs and instance.max_in_flight is not None:
+            instance.admission_controller = AdmissionController(
+                max_in_flight=instance.max_in_flight,
+                max_queued=instance.max_queued,
+            )
 
         return instance
 
@@ -29,34 +135,271 @@ class View(HTTPEndpoint, metaclass=ViewMeta):
         'get-instance': 'instance',
         'post-list': 'create',
         'patch-instance': 'update',
+        'put-instance': 'upsert',
         'delete-instance': 'delete',
+        'get-blob': 'download',
+        'put-blob': 'upload',
     }
+    filter_fields = {}
+    ordering_fields = ()
+    ordering_param = 'ordering'
+    aggregate_fields = {}
+    group_by_fields = ()
+    aggregate_param = 'aggregate'
+    group_by_param = 'group_by'
+    ids_param = 'ids'
+    max_ids = 200
+    reserved_query_params = ()
+    list_concurrency = 100
+    single_flight = False
+    single_flight_actions = ('list', 'instance')
+    batch_instance_lookups = False
+    instance_loader_window = 0.002
+    instance_loader_max_batch_size = 100
+    render_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='view-render')
+    render_offload_min_rows = 1000
+    render_offload_min_bytes = 1024 * 1024
+    render_chunk_size = 500
+    renderer_classes = (JSONRenderer, ColumnarJSONRenderer)
+    format_param = 'format'
+    export_chunk_size = 1000
+    bulk_ingest = False
+    ingest_batch_size = 500
+    read_connection = None
+    write_connection = None
+    read_methods = ('GET', 'HEAD')
+    read_after_write_window = 5
+    read_after_write_cookie = 'read_primary_until'
+    request_timeout = None
+    action_timeouts = {}
+    cancel_on_disconnect = False
+    admission_controller = None
+    max_in_flight = None
+    max_queued = 100
+    retry_after = 1
+    priority_lanes = {}
+    sync_field = None
+    since_param = 'since'
+    tombstone_model = None
+    event_broker = None
+    coalesce_writes = False
+    write_coalescer_window = 0.002
+    write_coalescer_max_batch_size = 100
+    allow_upsert = False
+    blob_fields = None
+    blob_chunk_size = 64 * 1024
+    blob_max_size = 16 * 1024 * 1024
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.queryset = self.get_queryset()
-        self.response_data = {
-            'content': {},
-            'status_code': 200
-        }
+        self._queryset = None
+        self._response_data = None
+        self.connection_name = None
+
+    @property
+    def db(self):
+        if self.connection_name is None:
+            return None
 
-    async def dispatch(self) -> None:  # pragma: no cover
-        request = Request(self.scope, receive=self.receive)
-        request_method = "get" if request.method == "HEAD" else request.method.lower()
-        if 'id' in request.path_params:
-            request_type = 'instance'
+        return Tortoise.get_connection(self.connection_name)
+
+    @property
+    def queryset(self):
+        if self._queryset is None:
+            self._queryset = self.using_connection(self.get_queryset())
+
+        return self._queryset
+
+    @queryset.setter
+    def queryset(self, value):
+        self._queryset = value
+
+    @property
+    def response_data(self):
+        if self._response_data is None:
+            self._response_data = {
+                'content': {},
+                'status_code': 200
+            }
+
+        return self._response_data
+
+    @response_data.setter
+    def response_data(self, value):
+        self._response_data = value
+
+    @staticmethod
+    def get_request_type(scope):
+        path_params = scope.get('path_params', ())
+        if 'id' not in path_params:
+            return 'list'
+
+        return 'blob' if 'field' in path_params else 'instance'
+
+    async def dispatch(self) -> None:
+        request_method = self.scope['method']
+        route = self.dispatch_table.get((request_method, self.get_request_type(self.scope)))
+        if route is None:
+            response = JSONResponse(**self.get_not_allowed_response(request_method))
+            await response(self.scope, self.receive, self.send)
         else:
-            request_type = 'list'
+            request = Request(self.scope, receive=self.receive)
+            self.connection_name = self.get_connection_name(request, route.name)
+            single_flight_key = self.get_single_flight_key(request, route.name)
+            if single_flight_key is not None:
+                coroutine_function = functools.partial(
+                    self.single_flight_group.do,
+                    single_flight_key,
+                    functools.partial(self.handle, route, request),
+                )
+            else:
+                coroutine_function = functools.partial(self.handle, route, request)
+
+            await self.respond_admitted(request, route, coroutine_function)
+
+    def get_admission_controller(self, handler_name):
+        return self.priority_lanes.get(handler_name, self.admission_controller)
+
+    def get_overloaded_response(self):
+        self.response_data['status_code'] = 503
+        self.response_data['content'] = {'detail': 'service unavailable'}
 
-        handler_name = self.action_mapping.get(f'{request_method}-{request_type}')
-        handler = getattr(self, handler_name, self.method_not_allowed)
-        is_async = asyncio.iscoroutinefunction(handler)
-        if is_async:
-            response = await handler(request)
+        return JSONResponse(**self.response_data, headers={'Retry-After': str(self.retry_after)})
+
+    async def respond(self, request, route, coroutine_function):
+        if self.is_cancellable(request, route.name):
+            response = await self.handle_cancellable(route, coroutine_function)
         else:
-            response = await run_in_threadpool(handler, request)
+            response = await coroutine_function()
         await response(self.scope, self.receive, self.send)
 
+    async def respond_admitted(self, request, route, coroutine_function):
+        admission_controller = self.get_admission_controller(route.name)
+        if admission_controller is None:
+            return await self.respond(request, route, coroutine_function)
+
+        if not await admission_controller.acquire():
+            response = self.get_overloaded_response()
+            return await response(self.scope, self.receive, self.send)
+
+        try:
+            await self.respond(request, route, coroutine_function)
+        finally:
+            admission_controller.release()
+
+    def get_timeout(self, handler_name):
+        return self.action_timeouts.get(handler_name, self.request_timeout)
+
+    def is_cancellable(self, request, handler_name):
+        return request.method in self.read_methods and (
+            self.cancel_on_disconnect or self.get_timeout(handler_name) is not None
+        )
+
+    async def wait_for_disconnect(self):
+        if not self.cancel_on_disconnect:
+            await asyncio.Event().wait()
+
+        while True:
+            message = await self.receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+    async def handle_cancellable(self, route, coroutine_function):
+        handler_task = asyncio.ensure_future(coroutine_function())
+        disconnect_task = asyncio.ensure_future(self.wait_for_disconnect())
+        done, _ = await asyncio.wait(
+            (handler_task, disconnect_task),
+            timeout=self.get_timeout(route.name),
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        disconnect_task.cancel()
+        if handler_task in done:
+            return handler_task.result()
+
+        handler_task.cancel()
+        await asyncio.gather(handler_task, disconnect_task, return_exceptions=True)
+        if disconnect_task in done:
+            self.cancelled_requests[(route.name, 'disconnect')] += 1
+            self.response_data['status_code'] = 499
+            self.response_data['content'] = {'detail': 'client disconnected'}
+        else:
+            self.cancelled_requests[(route.name, 'timeout')] += 1
+            self.response_data['status_code'] = 504
+            self.response_data['content'] = {'detail': 'request timeout'}
+
+        return JSONResponse(**self.response_data)
+
+    async def handle(self, route, request):
+        if route.is_async:
+            response = await route.handler(self, request)
+        else:
+            response = await run_in_threadpool(route.handler, self, request)
+
+        if self.is_read_after_write_response(request, response):
+            response.set_cookie(
+                self.read_after_write_cookie,
+                str(time.time() + self.read_after_write_window),
+                max_age=self.read_after_write_window,
+            )
+
+        return response
+
+    def using_connection(self, queryset):
+        if self.connection_name is None:
+            return queryset
+
+        return queryset.using_db(self.db)
+
+    def is_read_after_write(self, request):
+        try:
+            read_primary_until = float(request.cookies.get(self.read_after_write_cookie, 0))
+        except ValueError:
+            return False
+
+        return read_primary_until > time.time()
+
+    def is_read_after_write_response(self, request, response):
+        return (
+            self.read_connection is not None and
+            self.read_after_write_window > 0 and
+            request.method not in self.read_methods and
+            response.status_code < 400
+        )
+
+    def get_connection_name(self, request, handler_name=None):
+        if request.method not in self.read_methods:
+            return self.write_connection
+
+        read_connection = self.read_connection
+        priority_lane = self.priority_lanes.get(handler_name)
+        if priority_lane is not None and priority_lane.connection is not None:
+            read_connection = priority_lane.connection
+
+        if read_connection is None or self.is_read_after_write(request):
+            return self.write_connection
+
+        return read_connection
+
+    def get_single_flight_caller_key(self, request):
+        return request.headers.get('authorization')
+
+    def get_single_flight_key(self, request, handler_name):
+        if not self.single_flight or handler_name not in self.single_flight_actions:
+            return None
+
+        renderer = self.get_renderer(request) if handler_name == 'list' else None
+        if renderer is not None and renderer.streaming:
+            return None
+
+        return (
+            handler_name,
+            self.connection_name,
+            tuple(sorted(request.path_params.items())),
+            request.scope.get('query_string', b''),
+            request.headers.get('accept'),
+            self.get_single_flight_caller_key(request),
+        )
+
     @staticmethod
     async def get_request_data(request):
         try:
@@ -65,22 +408,281 @@ class View(HTTPEndpoint, metaclass=ViewMeta):
         except (ValueError, TypeError):
             return None
 
-    async def get_instance_from_pk(self, pk):
+    def annotate_queryset(self, queryset):
+        annotations = self.serializer_class.get_queryset_annotations()
+        if not annotations:
+            return queryset
+
+        return queryset.annotate(**annotations)
+
+    def get_instance_loader_key(self):
+        return self.connection_name
+
+    async def get_instance_from_pk(self, pk, queryset=None, queryset_kind=None):
+        if queryset is None:
+            queryset, queryset_kind = self.queryset, 'default'
+
+        if self.batch_instance_lookups and queryset_kind is not None:
+            return await self.instance_loader.load(
+                queryset, pk, key=(self.get_instance_loader_key(), queryset_kind, queryset.sql())
+            )
+
         try:
-            return await self.queryset.get(**{self.serializer_class.model_pk_field_name: pk})
+            return await queryset.get(**{self.serializer_class.model_pk_field_name: pk})
         except (exceptions.DoesNotExist, ValueError):
             return None
 
+    async def serialize_instance(self, instance):
+        return await self.serializer_class(instance=instance).to_row()
+
+    async def serialize_instances(self, instances):
+        await self.serializer_class.prefetch(instances, using_db=self.db)
+
+        return await bounded_map(self.serialize_instance, instances, self.list_concurrency)
+
+    def get_renderer(self, request):
+        renderer_class, options = negotiate_renderer(
+            self.renderer_classes, request, self.format_param
+        )
+        if renderer_class is None:
+            return None
+
+        return renderer_class(serializer_class=self.serializer_class, options=options)
+
+    def encode_rows(self, renderer, rows):
+        return [
+            renderer.encode_rows(rows[start:start + self.render_chunk_size])
+            for start in range(0, len(rows), self.render_chunk_size)
+        ]
+
+    def is_large_payload(self, rows, encoded_head):
+        if len(rows) >= self.render_offload_min_rows:
+            return True
+
+        head_size = sum(len(chunk) for chunk in encoded_head)
+        head_rows = min(len(rows), self.render_chunk_size) or 1
+
+        return head_size * len(rows) / head_rows >= self.render_offload_min_bytes
+
+    async def render_rows(self, renderer, rows):
+        encoded_head = self.encode_rows(renderer, rows[:self.render_chunk_size])
+        tail = rows[self.render_chunk_size:]
+        if tail and self.is_large_payload(rows, encoded_head):
+            encoded_tail = await run_in_executor(
+                self.render_executor, self.encode_rows, renderer, tail
+            )
+        else:
+            encoded_tail = self.encode_rows(renderer, tail)
+
+        return renderer.render(encoded_head + encoded_tail)
+
+    async def get_rows_response(self, renderer):
+        return Response(
+            content=await self.render_rows(renderer, self.response_data['content']),
+            status_code=self.response_data['status_code'],
+            headers={'Vary': 'Accept'},
+            media_type=renderer.media_type,
+        )
+
+    async def iterate_queryset(self, queryset, ordering):
+        pk_field_name = self.serializer_class.model_pk_field_name
+        if ordering:
+            queryset = queryset.order_by(*ordering, pk_field_name)
+            offset = 0
+        else:
+            queryset = queryset.order_by(pk_field_name)
+            offset = None
+
+        chunk_queryset = queryset
+        while True:
+            if offset is not None:
+                chunk_queryset = queryset.offset(offset)
+            instances = await chunk_queryset.limit(self.export_chunk_size)
+            if instances:
+                yield instances
+
+            if len(instances) < self.export_chunk_size:
+                return
+
+            if offset is not None:
+                offset += len(instances)
+            else:
+                chunk_queryset = queryset.filter(
+                    **{f'{pk_field_name}__gt': getattr(instances[-1], pk_field_name)}
+                )
+
+    async def stream_rows(self, renderer, queryset, ordering):
+        header = renderer.render_header()
+        if header:
+            yield header
+
+        async for instances in self.iterate_queryset(queryset, ordering):
+            yield renderer.encode_rows(await self.serialize_instances(instances))
+
+    def get_streaming_rows_response(self, request, renderer, queryset):
+        ordering, _ = self.query_filter.get_ordering(request.query_params)
+
+        return StreamingResponse(
+            self.stream_rows(renderer, queryset, ordering),
+            status_code=self.response_data['status_code'],
+            headers={'Vary': 'Accept'},
+            media_type=renderer.media_type,
+        )
+
+    def get_not_acceptable_response(self):
+        self.response_data['status_code'] = 406
+        self.response_data['content'] = {'detail': 'not acceptable'}
+
+        return JSONResponse(**self.response_data)
+
     async def list(self, request):
-        instances = await self.queryset
-        tasks = [self.serializer_class(instance=instance).to_dict() for instance in instances]
-        self.response_data['content'] = await asyncio.gather(*tasks)
+        renderer = self.get_renderer(request)
+        if renderer is None:
+            return self.get_not_acceptable_response()
+
+        queryset, errors = await self.query_filter.filter_queryset(
+            self.queryset, request.query_params
+        )
+        if errors:
+            self.response_data['status_code'] = 400
+            self.response_data['content'] = {'detail': errors}
+
+            return JSONResponse(**self.response_data)
+
+        if self.query_aggregator.is_aggregate_request(request.query_params):
+            return await self.aggregate(request, queryset)
+
+        queryset = self.annotate_queryset(queryset)
+        if self.ids_param in request.query_params:
+            if not isinstance(renderer, JSONRenderer):
+                return self.get_not_acceptable_response()
+
+            return await self.multi_get(request, queryset)
+
+        if self.sync_field is not None and self.since_param in request.query_params:
+            if not isinstance(renderer, JSONRenderer):
+                return self.get_not_acceptable_response()
+
+            return await self.sync(request, queryset)
+
+        if renderer.streaming:
+            return self.get_streaming_rows_response(request, renderer, queryset)
+
+        instances = await queryset
+        self.response_data['content'] = await self.serialize_instances(instances)
+
+        return await self.get_rows_response(renderer)
+
+    async def aggregate(self, request, queryset):
+        results, errors = await self.query_aggregator.aggregate(queryset, request.query_params)
+        if errors:
+            self.response_data['status_code'] = 400
+            self.response_data['content'] = {'detail': errors}
+        else:
+            self.response_data['content'] = results
+
+        return JSONResponse(**self.response_data)
+
+    def get_row_dicts(self, rows):
+        field_names = list(self.serializer_class.fields.keys())
+
+        return [dict(zip(field_names, row)) for row in rows]
+
+    @staticmethod
+    def get_pk_representation(pk):
+        return pk if isinstance(pk, int) else str(pk)
+
+    def parse_ids(self, value):
+        pk_field = self.serializer_class.model._meta.pk
+        requested_ids = {}
+        for raw_id in (item.strip() for item in value.split(',')):
+            if not raw_id:
+                continue
+
+            try:
+                pk = pk_field.to_python_value(raw_id)
+            except (TypeError, ValueError):
+                pk = None
+            requested_ids.setdefault(raw_id if pk is None else pk, pk)
+
+        return requested_ids
+
+    async def multi_get(self, request, queryset):
+        requested_ids = self.parse_ids(request.query_params[self.ids_param])
+        if not 0 < len(requested_ids) <= self.max_ids:
+            self.response_data['status_code'] = 400
+            self.response_data['content'] = {
+                'detail': {self.ids_param: f'must contain from 1 to {self.max_ids} ids'}
+            }
+
+            return JSONResponse(**self.response_data)
+
+        pks = [pk for pk in requested_ids.values() if pk is not None]
+        instances = await queryset.filter(
+            **{f'{self.serializer_class.model_pk_field_name}__in': pks}
+        ) if pks else []
+        instances_by_pk = {instance.pk: instance for instance in instances}
+        rows = await self.serialize_instances(
+            [instances_by_pk[pk] for pk in pks if pk in instances_by_pk]
+        )
+
+        self.response_data['content'] = {
+            'results': self.get_row_dicts(rows),
+            'missing': [
+                self.get_pk_representation(requested_id)
+                for requested_id, pk in requested_ids.items() if pk not in instances_by_pk
+            ],
+        }
+
+        return JSONResponse(**self.response_data)
+
+    async def get_deleted_pks(self, cursor):
+        if self.tombstone_model is None:
+            return [], cursor
+
+        tombstones = await self.using_connection(self.tombstone_model.filter(
+            model_name=self.serializer_class.model._meta.db_table, deleted_at__gt=cursor
+        ).order_by('deleted_at'))
+        pk_field = self.serializer_class.model._meta.pk
+        deleted_pks = []
+        for tombstone in tombstones:
+            deleted_pks.append(
+                self.get_pk_representation(pk_field.to_python_value(tombstone.object_pk))
+            )
+
+        return deleted_pks, max([cursor, *(tombstone.deleted_at for tombstone in tombstones)])
+
+    async def sync(self, request, queryset):
+        cursor = parse_cursor(request.query_params[self.since_param])
+        if cursor is None:
+            self.response_data['status_code'] = 400
+            self.response_data['content'] = {'detail': {self.since_param: 'incorrect cursor'}}
+
+            return JSONResponse(**self.response_data)
+
+        instances = await queryset.filter(
+            **{f'{self.sync_field}__gt': cursor}
+        ).order_by(self.sync_field, self.serializer_class.model_pk_field_name)
+        rows = await self.serialize_instances(instances)
+        deleted_pks, deleted_cursor = await self.get_deleted_pks(cursor)
+        changed_cursor = getattr(instances[-1], self.sync_field) if instances else cursor
+
+        self.response_data['content'] = {
+            'results': self.get_row_dicts(rows),
+            'deleted': deleted_pks,
+            'cursor': format_cursor(max(changed_cursor, deleted_cursor)),
+        }
 
         return JSONResponse(**self.response_data)
 
     async def instance(self, request):
-        instance = await self.get_instance_from_pk(request.path_params.get('id'))
+        instance = await self.get_instance_from_pk(
+            request.path_params.get('id'),
+            queryset=self.annotate_queryset(self.queryset),
+            queryset_kind='annotated',
+        )
         if instance:
+            await self.serializer_class.prefetch([instance], using_db=self.db)
             self.response_data['content'] = await self.serializer(instance=instance).to_dict()
         else:
             self.response_data['status_code'] = 404
@@ -106,15 +708,108 @@ class View(HTTPEndpoint, metaclass=ViewMeta):
             }
         }
 
+    @staticmethod
+    async def iterate_request_lines(request):
+        line_number, buffer = 0, b''
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                line_number += 1
+                yield line_number, line
+
+        if buffer:
+            yield line_number + 1, buffer
+
+    @staticmethod
+    def parse_ingest_line(line):
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return None, 'invalid json'
+
+        if not isinstance(data, dict) or not data:
+            return None, 'line must be not empty json object'
+
+        return data, None
+
+    async def ingest_batch(self, batch, summary):
+        serializers = [self.serializer_class(data=data) for _, data in batch]
+        results = await asyncio.gather(*[serializer.is_valid() for serializer in serializers])
+
+        valid_serializers, valid_line_numbers = [], []
+        for (line_number, _), serializer, is_valid in zip(batch, serializers, results):
+            if is_valid:
+                valid_serializers.append(serializer)
+                valid_line_numbers.append(line_number)
+            else:
+                summary['rejected'][line_number] = serializer.errors
+
+        if not valid_serializers:
+            return
+
+        fetch_pks = self.event_broker is not None
+        if await self.serializer_class.bulk_save(
+            valid_serializers, using_db=self.db, fetch_pks=fetch_pks
+        ):
+            summary['accepted'].extend(valid_line_numbers)
+            await self.publish_created_events(valid_serializers)
+            return
+
+        saved_serializers = []
+        for line_number, serializer in zip(valid_line_numbers, valid_serializers):
+            if await self.serializer_class.bulk_save(
+                [serializer], using_db=self.db, fetch_pks=fetch_pks
+            ):
+                summary['accepted'].append(line_number)
+                saved_serializers.append(serializer)
+            else:
+                summary['rejected'][line_number] = 'cannot save instance'
+
+        await self.publish_created_events(saved_serializers)
+
+    async def ingest(self, request):
+        summary = {'accepted': [], 'rejected': {}}
+        batch = []
+        async for line_number, line in self.iterate_request_lines(request):
+            if not line.strip():
+                continue
+
+            data, error = self.parse_ingest_line(line)
+            if error:
+                summary['rejected'][line_number] = error
+                continue
+
+            batch.append((line_number, data))
+            if len(batch) >= self.ingest_batch_size:
+                await self.ingest_batch(batch, summary)
+                batch = []
+
+        if batch:
+            await self.ingest_batch(batch, summary)
+
+        self.response_data['content'] = summary
+
+        return JSONResponse(**self.response_data)
+
+    @staticmethod
+    def is_ndjson_request(request):
+        content_type = request.headers.get('content-type', '')
+
+        return content_type.split(';')[0].strip() == NDJSONRenderer.media_type
+
     async def create(self, request):
         if 'id' in request.path_params.keys():
             return JSONResponse(**self.get_not_allowed_response('POST'))
 
+        if self.bulk_ingest and self.is_ndjson_request(request):
+            return await self.ingest(request)
+
         data = await self.get_request_data(request)
         if not data:
             return JSONResponse(**self.get_invalid_response('create'))
 
-        serializer = self.serializer_class(data=data)
+        serializer = self.serializer_class(data=data, using_db=self.db)
         is_valid = await serializer.is_valid()
 
         if not is_valid:
@@ -123,7 +818,7 @@ class View(HTTPEndpoint, metaclass=ViewMeta):
 
             return JSONResponse(**self.response_data)
 
-        if not await serializer.save():
+        if not await self.save_serializer(serializer):
             self.response_data['status_code'] = 500
             self.response_data['content'] = {'detail': 'cannot create, internal error'}
 
@@ -131,9 +826,20 @@ class View(HTTPEndpoint, metaclass=ViewMeta):
 
         self.response_data['status_code'] = 201
         self.response_data['content'] = await serializer.to_dict()
+        self.publish_event('create', serializer.instance, self.response_data['content'])
 
         return JSONResponse(**self.response_data)
 
+    async def save_serializer(self, serializer):
+        fields = self.serializer_class.fields
+        has_m2m_data = any(fields[name].is_m2m for name in serializer.validated_data)
+        if not self.coalesce_writes or has_m2m_data:
+            return await serializer.save()
+
+        return await self.write_coalescer.save(
+            serializer, key=self.connection_name, using_db=self.db
+        )
+
     async def update(self, request):
         pk = request.path_params.get('id')
         if not pk:
@@ -153,7 +859,7 @@ class View(HTTPEndpoint, metaclass=ViewMeta):
 
             return JSONResponse(**self.response_data)
 
-        serializer = self.serializer_class(instance=instance, data=data)
+        serializer = self.serializer_class(instance=instance, data=data, using_db=self.db)
         is_valid = await serializer.is_valid()
         if not is_valid:
             self.response_data['status_code'] = 404
@@ -169,6 +875,54 @@ class View(HTTPEndpoint, metaclass=ViewMeta):
             return JSONResponse(**self.response_data)
 
         self.response_data['content'] = await serializer.to_dict()
+        self.publish_event('update', instance, self.response_data['content'])
+
+        return JSONResponse(**self.response_data)
+
+    async def upsert(self, request):
+        try:
+            pk = self.serializer_class.model._meta.pk.to_python_value(
+                request.path_params.get('id')
+            )
+        except (TypeError, ValueError):
+            pk = None
+        if pk is None:
+            self.response_data['status_code'] = 400
+            self.response_data['content'] = {'detail': 'incorrect primary key'}
+
+            return JSONResponse(**self.response_data)
+
+        data = await self.get_request_data(request)
+        if not data:
+            self.response_data['status_code'] = 400
+            self.response_data['content'] = {'detail': 'invalid request for upsert'}
+
+            return JSONResponse(**self.response_data)
+
+        serializer = self.serializer_class(data=data, using_db=self.db)
+        if not await serializer.is_valid():
+            self.response_data['status_code'] = 400
+            self.response_data['content'] = {'detail': serializer.errors}
+
+            return JSONResponse(**self.response_data)
+
+        created = await serializer.upsert(pk)
+        if created is None and self.serializer_class.model_pk_field_name in serializer.errors:
+            self.response_data['status_code'] = 404
+            self.response_data['content'] = {'detail': 'objects does not exists'}
+
+            return JSONResponse(**self.response_data)
+
+        if created is None:
+            self.response_data['status_code'] = 500
+            self.response_data['content'] = {'detail': 'cannot upsert, internal error'}
+
+            return JSONResponse(**self.response_data)
+
+        action = 'create' if created else 'update'
+        self.response_data['status_code'] = 201 if created else 200
+        self.response_data['content'] = await serializer.to_dict()
+        self.publish_event(action, serializer.instance, self.response_data['content'])
 
         return JSONResponse(**self.response_data)
 
@@ -182,7 +936,135 @@ class View(HTTPEndpoint, metaclass=ViewMeta):
             self.response_data['status_code'] = 404
             self.response_data['content'] = {'detail': 'objects does not exists'}
         else:
-            await instance.delete()
+            data = None
+            if self.event_broker is not None:
+                data = await self.serializer_class(instance=instance).to_dict()
+            await self.delete_instance(instance)
+            self.publish_event('delete', instance, data)
             self.response_data['content'] = {'deleted': True}
 
         return JSONResponse(**self.response_data)
+
+    def get_blob_not_found_response(self):
+        self.response_data['status_code'] = 404
+        self.response_data['content'] = {'detail': 'objects does not exists'}
+
+        return JSONResponse(**self.response_data)
+
+    async def download(self, request):
+        field_name = request.path_params['field']
+        if field_name not in self.blob_field_names:
+            return self.get_blob_not_found_response()
+
+        try:
+            blobs = await self.queryset.filter(
+                **{self.serializer_class.model_pk_field_name: request.path_params['id']}
+            ).values_list(field_name, flat=True)
+        except ValueError:
+            blobs = []
+        if not blobs:
+            return self.get_blob_not_found_response()
+
+        blob = blobs[0] or b''
+        try:
+            byte_range = parse_range(request.headers.get('range'), len(blob))
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={'Content-Range': f'bytes */{len(blob)}'})
+
+        start, end = byte_range or (None, None)
+
+        return BlobResponse(
+            blob, start, end,
+            chunk_size=self.blob_chunk_size,
+            send_body=request.method != 'HEAD',
+        )
+
+    async def read_blob(self, request):
+        content_length = request.headers.get('content-length')
+        if content_length is None or not content_length.isdigit():
+            blob = bytearray()
+            async for chunk in request.stream():
+                blob += chunk
+                if len(blob) > self.blob_max_size:
+                    return None, 413
+
+            return blob, None
+
+        if int(content_length) > self.blob_max_size:
+            return None, 413
+
+        blob = bytearray(int(content_length))
+        blob_view, offset = memoryview(blob), 0
+        async for chunk in request.stream():
+            if offset + len(chunk) > len(blob):
+                return None, 400
+            blob_view[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+
+        if offset != len(blob):
+            return None, 400
+
+        return blob, None
+
+    async def upload(self, request):
+        field_name = request.path_params['field']
+        if field_name not in self.blob_field_names:
+            return self.get_blob_not_found_response()
+
+        if field_name in self.read_only_blob_field_names:
+            return JSONResponse(**self.get_not_allowed_response('PUT'))
+
+        instance = await self.get_instance_from_pk(request.path_params['id'])
+        if not instance:
+            return self.get_blob_not_found_response()
+
+        blob, error_status = await self.read_blob(request)
+        if error_status is not None:
+            self.response_data['status_code'] = error_status
+            self.response_data['content'] = {
+                'detail': 'blob too large' if error_status == 413 else 'incorrect content length'
+            }
+
+            return JSONResponse(**self.response_data)
+
+        fields_map = self.serializer_class.model._meta.fields_map
+        update_fields = [field_name] + [
+            name for name, field in fields_map.items() if getattr(field, 'auto_now', False)
+        ]
+        setattr(instance, field_name, blob)
+        await instance.save(update_fields=update_fields, using_db=self.db)
+        data = None
+        if self.event_broker is not None:
+            data = await self.serializer_class(instance=instance).to_dict()
+        self.publish_event('update', instance, data)
+        self.response_data['content'] = {'size': len(blob)}
+
+        return JSONResponse(**self.response_data)
+
+    def publish_event(self, action, instance, data):
+        if self.event_broker is None:
+            return
+
+        pk = instance.pk if isinstance(instance.pk, int) else str(instance.pk)
+        self.event_broker.publish(get_model_name(self.serializer_class.model), action, pk, data)
+
+    async def publish_created_events(self, serializers):
+        if self.event_broker is None:
+            return
+
+        rows = await asyncio.gather(*[serializer.to_dict() for serializer in serializers])
+        for serializer, data in zip(serializers, rows):
+            self.publish_event('create', serializer.instance, data)
+
+    async def delete_instance(self, instance):
+        if self.tombstone_model is None:
+            return await instance.delete(using_db=self.db)
+
+        connection_name = self.serializer_class.get_connection_name(self.db)
+        async with transactions.in_transaction(connection_name) as db:
+            await instance.delete(using_db=db)
+            await self.tombstone_model.create(
+                model_name=self.serializer_class.model._meta.db_table,
+                object_pk=str(instance.pk),
+                using_db=db,
+            )
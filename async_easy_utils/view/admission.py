@@ -0,0 +1,60 @@
+import asyncio
+from collections import deque
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight, max_queued=0):
+        if max_in_flight < 1 or max_queued < 0:
+            raise ValueError('max_in_flight must be positive and max_queued not negative')
+
+        self._max_in_flight = max_in_flight
+        self._max_queued = max_queued
+        self._waiters = deque()
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def acquire(self):
+        if self.in_flight < self._max_in_flight and not self._waiters:
+            self.in_flight += 1
+            return True
+
+        if len(self._waiters) >= self._max_queued:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+        return True
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self.in_flight -= 1
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    @property
+    def max_in_flight(self):
+        return self._max_in_flight
+
+
+class PriorityLane(AdmissionController):
+    def __init__(self, name, max_in_flight, max_queued=0, connection=None):
+        super().__init__(max_in_flight=max_in_flight, max_queued=max_queued)
+        self.name = name
+        self.connection = connection
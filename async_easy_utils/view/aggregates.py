@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from tortoise import functions
+
+from async_easy_utils.serializer.fields import Avg, RelatedField
+
+
+class QueryAggregator:
+    FUNCTIONS = {
+        'count': functions.Count,
+        'sum': functions.Sum,
+        'min': functions.Min,
+        'max': functions.Max,
+        'avg': Avg,
+    }
+    FUNCTION_SEPARATOR = ':'
+    VALUES_SEPARATOR = ','
+
+    def __init__(self, serializer_class, aggregate_fields=None, group_by_fields=(),
+                 aggregate_param='aggregate', group_by_param='group_by'):
+        self._serializer_class = serializer_class
+        self._aggregate_fields = aggregate_fields or {}
+        self._group_by_fields = group_by_fields
+        self._aggregate_param = aggregate_param
+        self._group_by_param = group_by_param
+
+    @property
+    def enabled(self):
+        return bool(self._aggregate_fields or self._group_by_fields)
+
+    @property
+    def query_params(self):
+        return (self._aggregate_param, self._group_by_param) if self.enabled else ()
+
+    def is_aggregate_request(self, query_params):
+        return self.enabled and self._aggregate_param in query_params
+
+    def _get_column_name(self, field_name):
+        model_field = self._serializer_class.model._meta.fields_map.get(field_name)
+
+        return getattr(model_field, 'source_field', None) or field_name
+
+    def _split_values(self, value):
+        return [item.strip() for item in value.split(self.VALUES_SEPARATOR) if item.strip()]
+
+    def get_annotations(self, query_params):
+        annotations = {}
+        for value in self._split_values(query_params.get(self._aggregate_param, '')):
+            function, _, field_name = value.partition(self.FUNCTION_SEPARATOR)
+            if function not in self.FUNCTIONS:
+                return None, {self._aggregate_param: f'unknown aggregate function {function}'}
+
+            if not field_name:
+                if function != 'count':
+                    return None, {self._aggregate_param: f'{function} requires field'}
+
+                annotations[function] = functions.Count(self._serializer_class.model_pk_field_name)
+                continue
+
+            if function not in self._aggregate_fields.get(field_name, ()):
+                return None, {self._aggregate_param: f'{value} aggregation not allowed'}
+
+            annotations[f'{function}_{field_name}'] = self.FUNCTIONS[function](
+                self._get_column_name(field_name)
+            )
+
+        if not annotations:
+            return None, {self._aggregate_param: 'missing aggregate functions'}
+
+        return annotations, None
+
+    def get_group_by(self, query_params):
+        group_by = self._split_values(query_params.get(self._group_by_param, ''))
+        if not all(field_name in self._group_by_fields for field_name in group_by):
+            return None, {self._group_by_param: 'grouping not allowed'}
+
+        return group_by, None
+
+    async def _to_representation(self, field_name, value):
+        field = self._serializer_class.fields[field_name]
+        if value is None or isinstance(field, RelatedField):
+            return value
+
+        return await field.to_representation(value)
+
+    async def aggregate(self, queryset, query_params):
+        annotations, errors = self.get_annotations(query_params)
+        group_by, group_by_errors = self.get_group_by(query_params)
+        if errors or group_by_errors:
+            return None, {**(errors or {}), **(group_by_errors or {})}
+
+        columns = {field_name: self._get_column_name(field_name) for field_name in group_by}
+        queryset = queryset.annotate(**annotations).order_by(*columns.values())
+        if columns:
+            queryset = queryset.group_by(*columns.values())
+        rows = await queryset.values(*columns.values(), *annotations.keys())
+
+        results = []
+        for row in rows:
+            result = {
+                field_name: await self._to_representation(field_name, row[column])
+                for field_name, column in columns.items()
+            }
+            result.update(
+                (name, float(row[name]) if isinstance(row[name], Decimal) else row[name])
+                for name in annotations.keys()
+            )
+            results.append(result)
+
+        return results, None
@@ -0,0 +1,76 @@
+from async_easy_utils.view.responses import StreamingResponse
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header, size):
+    if not header:
+        return None
+
+    unit, _, ranges = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in ranges:
+        return None
+
+    start, separator, end = ranges.strip().partition('-')
+    if not separator or not (start or end):
+        return None
+
+    try:
+        start = int(start) if start else None
+        end = int(end) if end else None
+    except ValueError:
+        return None
+
+    if start is None:
+        if end <= 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+
+        return max(size - end, 0), size
+
+    end = size - 1 if end is None else min(end, size - 1)
+    if start >= size or end < start:
+        raise RangeNotSatisfiable(header)
+
+    return start, end + 1
+
+
+class BlobResponse(StreamingResponse):
+    media_type = 'application/octet-stream'
+
+    def __init__(self, blob, start=None, end=None, chunk_size=65536, send_body=True,
+                 headers=None):
+        size = len(blob)
+        partial = start is not None
+        start, end = (start, end) if partial else (0, size)
+        self._blob = memoryview(blob)[start:end]
+        self._chunk_size = chunk_size
+
+        headers = dict(headers or {})
+        headers['Accept-Ranges'] = 'bytes'
+        headers['Content-Length'] = str(end - start)
+        if partial:
+            headers['Content-Range'] = f'bytes {start}-{end - 1}/{size}'
+
+        super().__init__(
+            self.iterate_chunks() if send_body else self.iterate_nothing(),
+            status_code=206 if partial else 200,
+            headers=headers,
+        )
+
+    async def iterate_chunks(self):
+        for offset in range(0, len(self._blob), self._chunk_size):
+            yield self._blob[offset:offset + self._chunk_size]
+
+    async def iterate_nothing(self):
+        return
+        yield
+
+    async def stream_response(self, send):
+        await send({'type': 'http.response.start', 'status': self.status_code,
+                    'headers': self.raw_headers})
+        async for chunk in self.body_iterator:
+            await send({'type': 'http.response.body', 'body': bytes(chunk), 'more_body': True})
+
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
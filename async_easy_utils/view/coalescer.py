@@ -0,0 +1,74 @@
+import asyncio
+
+
+class WriteCoalescerBatch:
+    def __init__(self, using_db):
+        self.using_db = using_db
+        self.pending = []
+        self.flush_handle = None
+
+
+class WriteCoalescer:
+    def __init__(self, serializer_class, window=0.002, max_batch_size=100):
+        self._serializer_class = serializer_class
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._batches = {}
+        self.batches = 0
+        self.fallbacks = 0
+
+    def _flush(self, key):
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+
+        if batch.flush_handle:
+            batch.flush_handle.cancel()
+
+        asyncio.ensure_future(self._save_batch(batch))
+
+    @staticmethod
+    async def _save_one(serializer, future):
+        try:
+            instance = await serializer.save()
+        except Exception as error:
+            if not future.done():
+                future.set_exception(error)
+        else:
+            if not future.done():
+                future.set_result(instance)
+
+    async def _save_batch(self, batch):
+        self.batches += 1
+        serializers = [serializer for serializer, _ in batch.pending]
+        try:
+            instances = await self._serializer_class.bulk_save(
+                serializers, using_db=batch.using_db, fetch_pks=True
+            )
+        except Exception:
+            instances = None
+
+        if instances is None:
+            self.fallbacks += 1
+            for serializer, future in batch.pending:
+                await self._save_one(serializer, future)
+
+            return
+
+        for instance, (_, future) in zip(instances, batch.pending):
+            if not future.done():
+                future.set_result(instance)
+
+    async def save(self, serializer, key=None, using_db=None):
+        loop = asyncio.get_event_loop()
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = WriteCoalescerBatch(using_db)
+            batch.flush_handle = loop.call_later(self._window, self._flush, key)
+
+        future = loop.create_future()
+        batch.pending.append((serializer, future))
+        if len(batch.pending) >= self._max_batch_size:
+            self._flush(key)
+
+        return await future
@@ -0,0 +1,177 @@
+import asyncio
+from collections import Counter, defaultdict
+
+from starlette.endpoints import HTTPEndpoint, WebSocketEndpoint
+from starlette.responses import JSONResponse
+
+from async_easy_utils.view.renderers import encode_json
+from async_easy_utils.view.responses import StreamingResponse
+
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+DISCONNECT = 'disconnect'
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, DISCONNECT)
+
+
+def get_model_name(model):
+    return model._meta.db_table
+
+
+class Subscription:
+    CLOSED = object()
+
+    def __init__(self, broker, model_name, queue_size, overflow_policy):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f'overflow policy must be one of {OVERFLOW_POLICIES}')
+
+        self._broker = broker
+        self._queue = asyncio.Queue(maxsize=queue_size + 1)
+        self._queue_size = queue_size
+        self._overflow_policy = overflow_policy
+        self.model_name = model_name
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, event):
+        if self.closed:
+            return
+
+        if self._queue.qsize() >= self._queue_size:
+            if self._overflow_policy == DISCONNECT:
+                self._broker.stats['disconnected'] += 1
+                return self.close()
+
+            self.dropped += 1
+            self._broker.stats['dropped'] += 1
+            if self._overflow_policy == DROP_NEWEST:
+                return
+
+            self._queue.get_nowait()
+
+        self._queue.put_nowait(event)
+
+    def close(self):
+        if self.closed:
+            return
+
+        self.closed = True
+        self._broker.unsubscribe(self)
+        self._queue.put_nowait(self.CLOSED)
+
+    async def get(self):
+        event = await self._queue.get()
+        if event is self.CLOSED:
+            raise StopAsyncIteration
+
+        return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+
+class EventBroker:
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self.stats = Counter()
+
+    def subscribe(self, model_name, queue_size=100, overflow_policy=DROP_OLDEST):
+        subscription = Subscription(self, model_name, queue_size, overflow_policy)
+        self._subscriptions[model_name].add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscriptions = self._subscriptions.get(subscription.model_name)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.model_name]
+
+    def publish(self, model_name, action, pk, data):
+        event = {'model': model_name, 'action': action, 'pk': pk, 'data': data}
+        self.stats['published'] += 1
+        for subscription in list(self._subscriptions.get(model_name, ())):
+            subscription.put(event)
+
+    def subscribers(self, model_name=None):
+        if model_name is not None:
+            return len(self._subscriptions.get(model_name, ()))
+
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+class EventEndpointMixin:
+    event_broker = None
+    models = ()
+    queue_size = 100
+    overflow_policy = DROP_OLDEST
+
+    def get_model_name(self, path_params):
+        model_name = path_params.get('model')
+        if model_name not in (get_model_name(model) for model in self.models):
+            return None
+
+        return model_name
+
+    def subscribe(self, model_name):
+        return self.event_broker.subscribe(
+            model_name, queue_size=self.queue_size, overflow_policy=self.overflow_policy
+        )
+
+
+class EventStreamEndpoint(EventEndpointMixin, HTTPEndpoint):
+    heartbeat_interval = 15
+
+    async def stream_events(self, subscription):
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield b': ping\n\n'
+                    continue
+                except StopAsyncIteration:
+                    return
+
+                yield f'event: {event["action"]}\ndata: {encode_json(event)}\n\n'.encode('utf-8')
+        finally:
+            subscription.close()
+
+    async def get(self, request):
+        model_name = self.get_model_name(request.path_params)
+        if model_name is None:
+            return JSONResponse({'detail': 'not found'}, status_code=404)
+
+        return StreamingResponse(
+            self.stream_events(self.subscribe(model_name)),
+            media_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache'},
+        )
+
+
+class EventWebSocketEndpoint(EventEndpointMixin, WebSocketEndpoint):
+    async def send_events(self, websocket, subscription):
+        async for event in subscription:
+            await websocket.send_text(encode_json(event))
+
+        await websocket.close()
+
+    async def on_connect(self, websocket):
+        self.subscription = None
+        model_name = self.get_model_name(websocket.path_params)
+        if model_name is None:
+            return await websocket.close()
+
+        await websocket.accept()
+        self.subscription = self.subscribe(model_name)
+        self.sender = asyncio.ensure_future(self.send_events(websocket, self.subscription))
+
+    async def on_disconnect(self, websocket, close_code):
+        if self.subscription is not None:
+            self.subscription.close()
+            self.sender.cancel()
+            await asyncio.gather(self.sender, return_exceptions=True)
@@ -0,0 +1,125 @@
+from async_easy_utils.serializer.fields import RelatedField, SlugRelatedField
+
+
+class QueryFilter:
+    LOOKUPS = (
+        'exact',
+        'in',
+        'gt',
+        'gte',
+        'lt',
+        'lte',
+        'contains',
+        'icontains',
+        'startswith',
+        'istartswith',
+        'isnull',
+    )
+    LOOKUP_SEPARATOR = '__'
+    VALUES_SEPARATOR = ','
+    BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+
+    def __init__(self, serializer_class, filter_fields=None, ordering_fields=(),
+                 ordering_param='ordering', ignored_params=()):
+        self._serializer_class = serializer_class
+        self._filter_fields = filter_fields or {}
+        self._ordering_fields = ordering_fields
+        self._ordering_param = ordering_param
+        self._ignored_params = set(ignored_params)
+
+    def _split_param(self, param):
+        field_name, _, lookup = param.partition(self.LOOKUP_SEPARATOR)
+
+        return field_name, lookup or 'exact'
+
+    def _get_filter_name(self, field_name, lookup):
+        model_field = self._serializer_class.model._meta.fields_map.get(field_name)
+        filter_name = getattr(model_field, 'source_field', None) or field_name
+        if lookup == 'exact':
+            return filter_name
+
+        return f'{filter_name}{self.LOOKUP_SEPARATOR}{lookup}'
+
+    async def _to_internal_value(self, field, value):
+        if isinstance(field, SlugRelatedField):
+            return value, None
+
+        internal_value, error = await field.to_internal_value(value)
+        if not error and isinstance(field, RelatedField):
+            internal_value = internal_value.pk
+
+        return internal_value, error
+
+    async def _get_filter_value(self, field, lookup, value):
+        if lookup == 'isnull':
+            if value.lower() not in self.BOOLEAN_VALUES:
+                return None, 'incorrect value, expected true or false'
+
+            return self.BOOLEAN_VALUES[value.lower()], None
+
+        if lookup == 'in':
+            values = []
+            for item in value.split(self.VALUES_SEPARATOR):
+                internal_value, error = await self._to_internal_value(field, item)
+                if error:
+                    return None, error
+                values.append(internal_value)
+
+            return values, None
+
+        return await self._to_internal_value(field, value)
+
+    async def get_filters(self, query_params):
+        filters, errors = {}, {}
+        for param, value in query_params.items():
+            if param == self._ordering_param or param in self._ignored_params:
+                continue
+
+            field_name, lookup = self._split_param(param)
+            if lookup not in self._filter_fields.get(field_name, ()):
+                errors[param] = 'filtering not allowed'
+                continue
+
+            field = self._serializer_class.fields[field_name]
+            filter_value, error = await self._get_filter_value(field, lookup, value)
+            if error:
+                errors[param] = error
+            elif isinstance(field, SlugRelatedField) and lookup != 'isnull':
+                slug_name = f'{field_name}{self.LOOKUP_SEPARATOR}{field.slug_field}'
+                filters[self._get_filter_name(slug_name, lookup)] = filter_value
+            else:
+                filters[self._get_filter_name(field_name, lookup)] = filter_value
+
+        return filters, errors
+
+    def get_ordering(self, query_params):
+        ordering = []
+        for value in query_params.get(self._ordering_param, '').split(self.VALUES_SEPARATOR):
+            value = value.strip()
+            if not value:
+                continue
+
+            field_name = value.lstrip('-')
+            if field_name not in self._ordering_fields:
+                return None, {self._ordering_param: 'ordering not allowed'}
+
+            direction = '-' if value.startswith('-') else ''
+            ordering.append(f'{direction}{self._get_filter_name(field_name, "exact")}')
+
+        return ordering, None
+
+    async def filter_queryset(self, queryset, query_params):
+        filters, errors = await self.get_filters(query_params)
+        ordering, ordering_error = self.get_ordering(query_params)
+        if ordering_error:
+            errors.update(ordering_error)
+
+        if errors:
+            return None, errors
+
+        if filters:
+            queryset = queryset.filter(**filters)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+
+        return queryset, None
@@ -0,0 +1,68 @@
+import asyncio
+
+
+class InstanceLoaderBatch:
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.pending = {}
+        self.flush_handle = None
+
+
+class InstanceLoader:
+    def __init__(self, model, window=0.002, max_batch_size=100):
+        self._model = model
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._batches = {}
+
+    def _to_pk_value(self, pk):
+        try:
+            return self._model._meta.pk.to_python_value(pk)
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+    def _flush(self, key):
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+
+        if batch.flush_handle:
+            batch.flush_handle.cancel()
+
+        asyncio.ensure_future(self._resolve(batch.queryset, batch.pending))
+
+    async def _resolve(self, queryset, pending):
+        pk_field_name = self._model._meta.pk_attr
+        try:
+            instances = await queryset.filter(**{f'{pk_field_name}__in': list(pending.keys())})
+        except Exception as error:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+
+            return
+
+        instances_by_pk = {instance.pk: instance for instance in instances}
+        for pk, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(instances_by_pk.get(pk))
+
+    async def load(self, queryset, pk, key=None):
+        pk = self._to_pk_value(pk)
+        if pk is None:
+            return None
+
+        loop = asyncio.get_event_loop()
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = InstanceLoaderBatch(queryset)
+            batch.flush_handle = loop.call_later(self._window, self._flush, key)
+
+        future = loop.create_future()
+        batch.pending.setdefault(pk, []).append(future)
+        if len(batch.pending) >= self._max_batch_size:
+            self._flush(key)
+
+        return await future
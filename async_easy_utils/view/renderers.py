@@ -0,0 +1,210 @@
+import csv
+import io
+import json
+
+from async_easy_utils.serializer.fields import SlugRelatedField, StringField
+
+
+def encode_json(value):
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(',', ':'),
+    )
+
+
+class Renderer:
+    format = None
+    media_type = None
+    query_params = ()
+    streaming = False
+
+    def __init__(self, serializer_class, options=None):
+        self._serializer_class = serializer_class
+        self._field_names = list(serializer_class.fields.keys())
+        self._options = options or {}
+
+    def encode_rows(self, rows):
+        raise NotImplementedError()  # pragma: no cover
+
+    def render(self, encoded_chunks):
+        raise NotImplementedError()  # pragma: no cover
+
+    def render_header(self):
+        return b''
+
+    @staticmethod
+    def join_chunks(encoded_chunks):
+        return b','.join(chunk for chunk in encoded_chunks if chunk)
+
+
+class JSONRenderer(Renderer):
+    format = 'json'
+    media_type = 'application/json'
+
+    def encode_rows(self, rows):
+        return encode_json(
+            [dict(zip(self._field_names, row)) for row in rows]
+        )[1:-1].encode('utf-8')
+
+    def render(self, encoded_chunks):
+        return b''.join((b'[', self.join_chunks(encoded_chunks), b']'))
+
+
+class ColumnarJSONRenderer(Renderer):
+    format = 'columnar'
+    media_type = 'application/vnd.columnar+json'
+    query_params = ('dictionary',)
+    TRUE_VALUES = ('1', 'true')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._dictionaries = {}
+        if str(self._options.get('dictionary', '')).lower() in self.TRUE_VALUES:
+            self._dictionaries = {
+                column: {}
+                for column, field in enumerate(self._serializer_class.fields.values())
+                if self._is_dictionary_field(field)
+            }
+
+    @staticmethod
+    def _is_dictionary_field(field):
+        if field.pk:
+            return False
+
+        return isinstance(field, StringField) or (
+            isinstance(field, SlugRelatedField) and not field.is_m2m
+        )
+
+    def _encode_value(self, column, value):
+        dictionary = self._dictionaries.get(column)
+        if dictionary is None or not isinstance(value, str):
+            return value
+
+        return dictionary.setdefault(value, len(dictionary))
+
+    def encode_rows(self, rows):
+        if self._dictionaries:
+            rows = [
+                [self._encode_value(column, value) for column, value in enumerate(row)]
+                for row in rows
+            ]
+
+        return encode_json(rows)[1:-1].encode('utf-8')
+
+    def render(self, encoded_chunks):
+        parts = [
+            encode_json({'fields': self._field_names})[:-1].encode('utf-8'),
+            b',"rows":[',
+            self.join_chunks(encoded_chunks),
+            b']',
+        ]
+        if self._dictionaries:
+            dictionaries = {
+                self._field_names[column]: list(dictionary.keys())
+                for column, dictionary in self._dictionaries.items()
+            }
+            parts.extend((b',"dictionaries":', encode_json(dictionaries).encode('utf-8')))
+        parts.append(b'}')
+
+        return b''.join(parts)
+
+
+class NDJSONRenderer(Renderer):
+    format = 'ndjson'
+    media_type = 'application/x-ndjson'
+    streaming = True
+
+    def encode_rows(self, rows):
+        return ''.join(
+            f'{encode_json(dict(zip(self._field_names, row)))}\n' for row in rows
+        ).encode('utf-8')
+
+    def render(self, encoded_chunks):
+        return b''.join(encoded_chunks)
+
+
+class CSVRenderer(Renderer):
+    format = 'csv'
+    media_type = 'text/csv'
+    streaming = True
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, (dict, list)):
+            return encode_json(value)
+
+        return value
+
+    def _write_rows(self, rows):
+        output = io.StringIO()
+        csv.writer(output).writerows(rows)
+
+        return output.getvalue().encode('utf-8')
+
+    def encode_rows(self, rows):
+        return self._write_rows(
+            [[self._encode_value(value) for value in row] for row in rows]
+        )
+
+    def render_header(self):
+        return self._write_rows([self._field_names])
+
+    def render(self, encoded_chunks):
+        return b''.join((self.render_header(), *encoded_chunks))
+
+
+def parse_accept(accept):
+    media_types = []
+    for position, item in enumerate(accept.split(',')):
+        media_type, *params = [part.strip() for part in item.split(';')]
+        options = {
+            name.strip(): value.strip()
+            for name, _, value in (param.partition('=') for param in params)
+        }
+        try:
+            quality = float(options.pop('q', 1))
+        except ValueError:
+            quality = 0
+
+        if media_type and quality > 0:
+            media_types.append((-quality, position, media_type.lower(), options))
+
+    return [(media_type, options) for _, _, media_type, options in sorted(media_types)]
+
+
+def media_type_matches(pattern, media_type):
+    pattern_type, _, pattern_subtype = pattern.partition('/')
+    media_type_type, _, media_type_subtype = media_type.partition('/')
+
+    return (
+        pattern_type in ('*', media_type_type) and
+        pattern_subtype in ('*', media_type_subtype)
+    )
+
+
+def negotiate_renderer(renderer_classes, request, format_param):
+    requested_format = request.query_params.get(format_param)
+    if requested_format:
+        for renderer_class in renderer_classes:
+            if renderer_class.format == requested_format:
+                return renderer_class, {
+                    name: request.query_params[name]
+                    for name in renderer_class.query_params
+                    if name in request.query_params
+                }
+
+        return None, None
+
+    accept = request.headers.get('accept')
+    if not accept:
+        return renderer_classes[0], {}
+
+    for media_type, options in parse_accept(accept):
+        for renderer_class in renderer_classes:
+            if media_type_matches(media_type, renderer_class.media_type):
+                return renderer_class, options
+
+    return None, None
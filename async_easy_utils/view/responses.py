@@ -0,0 +1,24 @@
+import asyncio
+
+from starlette import responses
+
+
+class StreamingResponse(responses.StreamingResponse):
+    async def __call__(self, scope, receive, send):
+        stream_task = asyncio.ensure_future(self.stream_response(send))
+        disconnect_task = asyncio.ensure_future(self.listen_for_disconnect(receive))
+        try:
+            await asyncio.wait(
+                (stream_task, disconnect_task), return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for task in (stream_task, disconnect_task):
+                task.cancel()
+            await asyncio.gather(stream_task, disconnect_task, return_exceptions=True)
+            await self.body_iterator.aclose()
+
+        if not stream_task.cancelled() and stream_task.exception():
+            raise stream_task.exception()
+
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,40 @@
+import asyncio
+
+
+class SingleFlightCall:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+
+    def _remove_call(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _get_call(self, key, coroutine_function):
+        call = self._calls.get(key)
+        if call is None:
+            call = SingleFlightCall(asyncio.ensure_future(coroutine_function()))
+            call.task.add_done_callback(lambda _: self._remove_call(key, call))
+            self._calls[key] = call
+
+        return call
+
+    async def do(self, key, coroutine_function):
+        call = self._get_call(key, coroutine_function)
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                self._remove_call(key, call)
+                call.task.cancel()
+
+    @property
+    def in_flight(self):
+        return len(self._calls)
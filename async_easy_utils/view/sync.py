@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+
+from tortoise import fields
+from tortoise.models import Model
+
+
+class Tombstone(Model):
+    id = fields.IntField(pk=True)
+    model_name = fields.CharField(max_length=255, index=True)
+    object_pk = fields.CharField(max_length=255)
+    deleted_at = fields.DatetimeField(auto_now_add=True, index=True)
+
+    class Meta:
+        abstract = True
+
+
+def parse_cursor(value):
+    try:
+        cursor = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+    if cursor.tzinfo is not None:
+        cursor = cursor.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return cursor
+
+
+def format_cursor(cursor):
+    return cursor.isoformat()
@@ -1,4 +1,11 @@
+from tortoise.fields import BinaryField, DatetimeField
+
+from async_easy_utils.serializer.fields import AggregateField, MethodField, NestedField
 from async_easy_utils.utils import MetaValidatorMixin
+from async_easy_utils.view.admission import AdmissionController
+from async_easy_utils.view.aggregates import QueryAggregator
+from async_easy_utils.view.filters import QueryFilter
+from async_easy_utils.view.sync import Tombstone
 
 
 class ViewMetaValidator(MetaValidatorMixin):
@@ -6,6 +13,15 @@ class ViewMetaValidator(MetaValidatorMixin):
         self._instance = instance
         self._attrs = attrs
 
+    def _is_queryable_field(self, field_name):
+        field = self._attrs['serializer_class'].fields.get(field_name)
+
+        return (
+            field is not None and
+            not isinstance(field, (AggregateField, MethodField, NestedField)) and
+            not field.is_m2m
+        )
+
     def check_if_queryset_exists(self):
         if 'get_queryset' not in self._attrs:
             raise ValueError(f'{self._instance.__name__} missing queryset in view')
@@ -16,3 +32,168 @@ class ViewMetaValidator(MetaValidatorMixin):
 
     def check_if_serializer_class_is_serializer_instance(self):
         pass    # TODO
+
+    def check_list_filter_fields(self):
+        for field_name, lookups in self._instance.filter_fields.items():
+            if not self._is_queryable_field(field_name):
+                raise ValueError(
+                    f'{self._instance.__name__} filter field {field_name} '
+                    f'not in serializer fields or cannot be filtered'
+                )
+
+            if not all(lookup in QueryFilter.LOOKUPS for lookup in lookups):
+                raise ValueError(
+                    f'{self._instance.__name__} incorrect lookups for filter field {field_name}'
+                )
+
+    def check_list_ordering_fields(self):
+        if not all(self._is_queryable_field(field_name)
+                   for field_name in self._instance.ordering_fields):
+            raise ValueError(
+                f'{self._instance.__name__} ordering fields not in serializer '
+                f'fields or cannot be ordered'
+            )
+
+    def check_aggregate_fields(self):
+        for field_name, functions in self._instance.aggregate_fields.items():
+            if not self._is_queryable_field(field_name):
+                raise ValueError(
+                    f'{self._instance.__name__} aggregate field {field_name} '
+                    f'not in serializer fields or cannot be aggregated'
+                )
+
+            if not all(function in QueryAggregator.FUNCTIONS for function in functions):
+                raise ValueError(
+                    f'{self._instance.__name__} incorrect functions for aggregate '
+                    f'field {field_name}'
+                )
+
+    def check_group_by_fields(self):
+        if not all(self._is_queryable_field(field_name)
+                   for field_name in self._instance.group_by_fields):
+            raise ValueError(
+                f'{self._instance.__name__} group by fields not in serializer '
+                f'fields or cannot be grouped'
+            )
+
+    def check_max_ids(self):
+        max_ids = self._instance.max_ids
+        if not isinstance(max_ids, int) or max_ids < 1:
+            raise ValueError(f'{self._instance.__name__} max_ids must be positive int')
+
+    def check_list_concurrency(self):
+        list_concurrency = self._instance.list_concurrency
+        if not isinstance(list_concurrency, int) or list_concurrency < 1:
+            raise ValueError(f'{self._instance.__name__} list_concurrency must be positive int')
+
+    def check_render_chunk_size(self):
+        render_chunk_size = self._instance.render_chunk_size
+        if not isinstance(render_chunk_size, int) or render_chunk_size < 1:
+            raise ValueError(f'{self._instance.__name__} render_chunk_size must be positive int')
+
+    def check_export_chunk_size(self):
+        export_chunk_size = self._instance.export_chunk_size
+        if not isinstance(export_chunk_size, int) or export_chunk_size < 1:
+            raise ValueError(f'{self._instance.__name__} export_chunk_size must be positive int')
+
+    def check_ingest_batch_size(self):
+        ingest_batch_size = self._instance.ingest_batch_size
+        if not isinstance(ingest_batch_size, int) or ingest_batch_size < 1:
+            raise ValueError(f'{self._instance.__name__} ingest_batch_size must be positive int')
+
+    def check_read_after_write_window(self):
+        window = self._instance.read_after_write_window
+        if not isinstance(window, (int, float)) or window < 0:
+            raise ValueError(
+                f'{self._instance.__name__} read_after_write_window must be not negative number'
+            )
+
+    def check_request_timeouts(self):
+        timeouts = [self._instance.request_timeout, *self._instance.action_timeouts.values()]
+        if not all(
+            timeout is None or (isinstance(timeout, (int, float)) and timeout > 0)
+            for timeout in timeouts
+        ):
+            raise ValueError(f'{self._instance.__name__} request timeouts must be positive')
+
+    def check_admission_limits(self):
+        max_in_flight, max_queued = self._instance.max_in_flight, self._instance.max_queued
+        if max_in_flight is not None and (not isinstance(max_in_flight, int) or max_in_flight < 1):
+            raise ValueError(f'{self._instance.__name__} max_in_flight must be positive int')
+
+        if not isinstance(max_queued, int) or max_queued < 0:
+            raise ValueError(f'{self._instance.__name__} max_queued must be not negative int')
+
+    def check_priority_lanes(self):
+        handler_names = set(self._instance.action_mapping.values())
+        for handler_name, priority_lane in self._instance.priority_lanes.items():
+            if handler_name not in handler_names:
+                raise ValueError(
+                    f'{self._instance.__name__} priority lane for unknown action {handler_name}'
+                )
+
+            if not isinstance(priority_lane, AdmissionController):
+                raise ValueError(
+                    f'{self._instance.__name__} priority lane {handler_name} '
+                    f'must be AdmissionController instance'
+                )
+
+    def check_sync_field(self):
+        sync_field = self._instance.sync_field
+        if sync_field is None:
+            return
+
+        model = self._attrs['serializer_class'].model
+        if not isinstance(model._meta.fields_map.get(sync_field), DatetimeField):
+            raise ValueError(f'{self._instance.__name__} sync_field must be model DatetimeField')
+
+    def check_tombstone_model(self):
+        tombstone_model = self._instance.tombstone_model
+        if tombstone_model is None:
+            return
+
+        if not (isinstance(tombstone_model, type) and issubclass(tombstone_model, Tombstone)):
+            raise ValueError(f'{self._instance.__name__} tombstone_model must be Tombstone model')
+
+        if self._instance.sync_field is None:
+            raise ValueError(f'{self._instance.__name__} tombstone_model requires sync_field')
+
+    def check_write_coalescer(self):
+        window = self._instance.write_coalescer_window
+        max_batch_size = self._instance.write_coalescer_max_batch_size
+        if not isinstance(window, (int, float)) or window < 0:
+            raise ValueError(
+                f'{self._instance.__name__} write_coalescer_window must be not negative number'
+            )
+
+        if not isinstance(max_batch_size, int) or max_batch_size < 1:
+            raise ValueError(
+                f'{self._instance.__name__} write_coalescer_max_batch_size must be positive int'
+            )
+
+    def check_blob_sizes(self):
+        if not all(isinstance(size, int) and size > 0 for size in (
+            self._instance.blob_chunk_size, self._instance.blob_max_size
+        )):
+            raise ValueError(
+                f'{self._instance.__name__} blob_chunk_size and blob_max_size must be positive int'
+            )
+
+    def check_blob_fields(self):
+        blob_fields = self._instance.blob_fields
+        if blob_fields is None:
+            return
+
+        fields_map = self._attrs['serializer_class'].model._meta.fields_map
+        if not all(isinstance(fields_map.get(field_name), BinaryField)
+                   for field_name in blob_fields):
+            raise ValueError(f'{self._instance.__name__} blob_fields must be model BinaryFields')
+
+    def check_bulk_ingest_serializer_fields(self):
+        if self._instance.bulk_ingest and any(
+            field.is_m2m and not field.read_only
+            for field in self._attrs['serializer_class'].fields.values()
+        ):
+            raise ValueError(
+                f'{self._instance.__name__} bulk ingest does not support many to many fields'
+            )
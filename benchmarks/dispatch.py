@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from async_easy_utils.view import View
+from tests.fixtures import (
+    CorrectSerializerThree,
+    SampleModel,
+)
+from tests.helpers import DBHandler
+
+
+REQUESTS = 50000
+RESPONSE = JSONResponse({'detail': 'ok'})
+
+
+class SampleModelView(View):
+    serializer_class = CorrectSerializerThree
+
+    def get_queryset(self):
+        return SampleModel.all()
+
+    async def list(self, request):
+        return RESPONSE
+
+
+class LegacySampleModelView(View):
+    serializer_class = CorrectSerializerThree
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queryset = self.get_queryset()
+        self.response_data = {
+            'content': {},
+            'status_code': 200
+        }
+
+    def get_queryset(self):
+        return SampleModel.all()
+
+    async def list(self, request):
+        return RESPONSE
+
+    async def dispatch(self):
+        request = Request(self.scope, receive=self.receive)
+        request_method = "get" if request.method == "HEAD" else request.method.lower()
+        if 'id' in request.path_params:
+            request_type = 'instance'
+        else:
+            request_type = 'list'
+
+        handler_name = self.action_mapping.get(f'{request_method}-{request_type}')
+        handler = getattr(self, handler_name or '', self.method_not_allowed)
+        if asyncio.iscoroutinefunction(handler):
+            response = await handler(request)
+        else:
+            response = await run_in_threadpool(handler, request)
+        await response(self.scope, self.receive, self.send)
+
+
+async def receive():
+    return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+
+async def send(message):
+    pass
+
+
+async def run(view_class, method):
+    scope = {'type': 'http', 'method': method, 'path': '/', 'path_params': {},
+             'query_string': b'', 'headers': []}
+
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await view_class(scope, receive, send)
+
+    return time.perf_counter() - start
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    with DBHandler():
+        for method in ('GET', 'PUT'):
+            for view_class in (LegacySampleModelView, SampleModelView):
+                elapsed = loop.run_until_complete(run(view_class, method))
+                print(f'{view_class.__name__} {method}: {REQUESTS} requests '
+                      f'in {elapsed:.3f}s ({elapsed / REQUESTS * 1e6:.1f}us per request)')
+
+
+if __name__ == '__main__':
+    main()
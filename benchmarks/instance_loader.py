@@ -0,0 +1,64 @@
+import asyncio
+import random
+import time
+
+from async_easy_utils.view import View
+from tests.fixtures import (
+    CorrectSerializerThree,
+    SampleModel,
+)
+from tests.helpers import DBHandler
+
+
+ROWS = 1000
+REQUESTS = 2000
+
+
+class SampleModelView(View):
+    serializer_class = CorrectSerializerThree
+
+    def get_queryset(self):
+        return SampleModel.all()
+
+
+class BatchedSampleModelView(View):
+    serializer_class = CorrectSerializerThree
+    batch_instance_lookups = True
+
+    def get_queryset(self):
+        return SampleModel.all()
+
+
+async def create_rows():
+    await SampleModel.bulk_create([SampleModel(name=f'model_{index}') for index in range(ROWS)])
+
+    return await SampleModel.all().values_list('id', flat=True)
+
+
+async def run(view_class, pks):
+    async def request(pk):
+        view = view_class({'type': 'http'}, None, None)
+        return await view.get_instance_from_pk(pk)
+
+    start = time.perf_counter()
+    instances = await asyncio.gather(*[request(pk) for pk in pks])
+    elapsed = time.perf_counter() - start
+    assert all(instances)
+
+    return elapsed
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    with DBHandler():
+        all_pks = loop.run_until_complete(create_rows())
+        pks = [str(random.choice(all_pks)) for _ in range(REQUESTS)]
+
+        for view_class in (SampleModelView, BatchedSampleModelView):
+            elapsed = loop.run_until_complete(run(view_class, pks))
+            print(f'{view_class.__name__}: {REQUESTS} concurrent lookups '
+                  f'in {elapsed:.3f}s ({REQUESTS / elapsed:.0f} req/s)')
+
+
+if __name__ == '__main__':
+    main()
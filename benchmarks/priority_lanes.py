@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from async_easy_utils.view import View
+from async_easy_utils.view.admission import PriorityLane
+from tests.fixtures import (
+    CorrectSerializerThree,
+    SampleModel,
+)
+from tests.helpers import DBHandler, call_view
+
+
+ROWS = 3000
+LIST_CLIENTS = 4
+INSTANCE_REQUESTS = 300
+
+
+class SampleModelView(View):
+    serializer_class = CorrectSerializerThree
+
+    def get_queryset(self):
+        return SampleModel.all()
+
+
+class LanedSampleModelView(View):
+    serializer_class = CorrectSerializerThree
+    priority_lanes = {
+        'list': PriorityLane('heavy', max_in_flight=1, max_queued=100),
+        'instance': PriorityLane('point', max_in_flight=50, max_queued=1000),
+    }
+
+    def get_queryset(self):
+        return SampleModel.all()
+
+
+async def list_client(view_class, stop):
+    requests = 0
+    while not stop.is_set():
+        await call_view(view_class)
+        requests += 1
+
+    return requests
+
+
+async def run(view_class, pk):
+    stop = asyncio.Event()
+    list_clients = [asyncio.ensure_future(list_client(view_class, stop))
+                    for _ in range(LIST_CLIENTS)]
+    await asyncio.sleep(0.1)
+
+    latencies = []
+    for _ in range(INSTANCE_REQUESTS):
+        start = time.perf_counter()
+        await call_view(view_class, path_params={'id': pk})
+        latencies.append(time.perf_counter() - start)
+
+    stop.set()
+    list_requests = sum(await asyncio.gather(*list_clients))
+    latencies.sort()
+
+    return latencies, list_requests
+
+
+def percentile(latencies, value):
+    return latencies[min(len(latencies) - 1, int(len(latencies) * value))] * 1000
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    with DBHandler():
+        loop.run_until_complete(SampleModel.bulk_create(
+            [SampleModel(name=f'model_{index}') for index in range(ROWS)]
+        ))
+        pk = loop.run_until_complete(SampleModel.first()).pk
+        for view_class in (SampleModelView, LanedSampleModelView):
+            latencies, list_requests = loop.run_until_complete(run(view_class, pk))
+            print(f'{view_class.__name__}: instance p50 {percentile(latencies, 0.5):.1f}ms '
+                  f'p99 {percentile(latencies, 0.99):.1f}ms, '
+                  f'{list_requests} list requests of {ROWS} rows meanwhile')
+
+
+if __name__ == '__main__':
+    main()
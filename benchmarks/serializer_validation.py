@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from async_easy_utils.serializer import Serializer
+from tests.fixtures import SampleModelChild
+
+
+PAYLOADS = 100000
+VALID_DATA = {
+    'name': 'child',
+    'number': 1,
+    'data': 'data',
+}
+INVALID_DATA = {
+    'id': 1,
+    'name': 'child',
+    'number': 1,
+    'created': '2020-01-01 00:00:00',
+}
+
+
+class ValidationSerializer(Serializer):
+    class Meta:
+        model = SampleModelChild
+        fields = ('id', 'name', 'number', 'created', 'data')
+        read_only_fields = ('created',)
+
+
+class LegacyValidationSerializer(ValidationSerializer):
+    class Meta:
+        model = SampleModelChild
+        fields = ('id', 'name', 'number', 'created', 'data')
+        read_only_fields = ('created',)
+
+    def _check_input_data_for_primary_key(self):
+        if self.model_pk_field_name in self._data.keys():
+            self._errors.update(
+                {self.model_pk_field_name: 'primary key, cannot be in input'}
+            )
+
+    def _check_input_data_for_read_only_values(self):
+        self._errors.update(
+            {
+                field_name: 'field is read only'
+                for field_name in self._data.keys()
+                if self.fields[field_name].read_only
+            }
+        )
+
+    def _check_input_data_for_missing_values(self):
+        self._errors.update(
+            {
+                field_name: 'missing in input'
+                for field_name, field in self.fields.items()
+                if field_name not in self._data.keys() and not field.read_only
+            }
+        )
+
+    async def is_valid(self):
+        self._check_input_data_for_primary_key()
+        self._check_input_data_for_missing_values()
+        self._check_input_data_for_read_only_values()
+
+        if self._errors:
+            return False
+
+        await self._process_input_data_to_fields_internal_values()
+
+        return not bool(self._errors)
+
+
+async def run(serializer_class, data):
+    start = time.perf_counter()
+    for _ in range(PAYLOADS):
+        await serializer_class(data=data).is_valid()
+
+    return time.perf_counter() - start
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    for name, data in (('valid', VALID_DATA), ('invalid', INVALID_DATA)):
+        for serializer_class in (LegacyValidationSerializer, ValidationSerializer):
+            elapsed = loop.run_until_complete(run(serializer_class, data))
+            print(f'{serializer_class.__name__} {name}: {PAYLOADS} payloads '
+                  f'in {elapsed:.3f}s ({PAYLOADS / elapsed:.0f} payloads/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -27,7 +27,7 @@ setup(name='async_easy_utils',
                   'with TorToiseORM and Starlette framework',
       url='https://www.github.com/t1waz/rest_utils',
       license='MIT',
-      packages=find_packages(),
+      packages=find_packages(exclude=('tests', 'tests.*', 'benchmarks', 'benchmarks.*')),
       classifiers=[
           "Programming Language :: Python :: 3",
           "License :: OSI Approved :: MIT License",
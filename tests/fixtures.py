@@ -2,8 +2,15 @@ from tortoise import fields
 from tortoise.models import Model
 
 from async_easy_utils.serializer import Serializer
-from async_easy_utils.serializer.fields import SlugRelatedField
+from async_easy_utils.serializer.fields import AggregateField, NestedField, SlugRelatedField
 from async_easy_utils.view import View
+from async_easy_utils.view.sync import Tombstone
+from async_easy_utils.view.renderers import (
+    ColumnarJSONRenderer,
+    CSVRenderer,
+    JSONRenderer,
+    NDJSONRenderer,
+)
 
 
 class SampleModel(Model):
@@ -25,6 +32,16 @@ class SampleModelGroups(Model):
     sample_models = fields.ManyToManyField('tests.SampleModel', related_name='groups')
 
 
+class SampleSyncModel(Model):
+    id = fields.IntField(pk=True)
+    name = fields.TextField(max_length=400)
+    updated = fields.DatetimeField(auto_now=True)
+
+
+class SampleTombstone(Tombstone):
+    pass
+
+
 class IncorrectModel:
     pass
 
@@ -75,6 +92,54 @@ class CorrectSerializerFive(Serializer):
         fields = ('id', 'name', 'number', 'created', 'data', 'sample_model')
 
 
+class NestedChildSerializer(Serializer):
+    class Meta:
+        model = SampleModelChild
+        fields = ('id', 'name', 'number')
+
+
+class NestedSampleModelSerializer(Serializer):
+    childs = NestedField(serializer_class=NestedChildSerializer, many=True)
+
+    class Meta:
+        model = SampleModel
+        fields = ('id', 'name', 'childs')
+
+
+class NestedGroupSerializer(Serializer):
+    sample_models = NestedField(serializer_class=NestedSampleModelSerializer, many=True)
+
+    class Meta:
+        model = SampleModelGroups
+        fields = ('id', 'name', 'sample_models')
+
+
+class NestedChildWithParentSerializer(Serializer):
+    sample_model = NestedField(serializer_class=CorrectSerializerThree)
+
+    class Meta:
+        model = SampleModelChild
+        fields = ('id', 'name', 'sample_model')
+
+
+class SampleModelStatsSerializer(Serializer):
+    childs_count = AggregateField('count', 'childs')
+    childs_number_sum = AggregateField('sum', 'childs', 'number')
+    childs_number_max = AggregateField('max', 'childs', 'number')
+    groups_count = AggregateField('count', 'groups')
+
+    class Meta:
+        model = SampleModel
+        fields = ('id', 'name', 'childs_count', 'childs_number_sum', 'childs_number_max',
+                  'groups_count')
+
+
+class SampleSyncSerializer(Serializer):
+    class Meta:
+        model = SampleSyncModel
+        fields = ('id', 'name')
+
+
 class SampleModelView(View):
     serializer_class = CorrectSerializerThree
 
@@ -84,6 +149,67 @@ class SampleModelView(View):
 
 class SampleModelChildView(View):
     serializer_class = CorrectSerializerTwo
+    filter_fields = {
+        'name': ('exact', 'icontains'),
+        'number': ('exact', 'in', 'gte', 'lte'),
+        'sample_model': ('exact', 'in'),
+    }
+    ordering_fields = ('name', 'number')
+    renderer_classes = (JSONRenderer, ColumnarJSONRenderer, NDJSONRenderer, CSVRenderer)
+    export_chunk_size = 3
+    bulk_ingest = True
+    ingest_batch_size = 2
+
+    def get_queryset(self):
+        return SampleModelChild.all()
+
+
+class NestedGroupView(View):
+    serializer_class = NestedGroupSerializer
+
+    def get_queryset(self):
+        return SampleModelGroups.all()
+
+
+class SampleModelStatsView(View):
+    serializer_class = SampleModelStatsSerializer
+    filter_fields = {
+        'name': ('exact',),
+    }
+
+    def get_queryset(self):
+        return SampleModel.all()
+
+
+class SampleModelChildBlobSerializer(Serializer):
+    class Meta:
+        model = SampleModelChild
+        fields = ('id', 'name', 'number')
+
+
+class SampleModelChildBlobView(View):
+    serializer_class = SampleModelChildBlobSerializer
 
     def get_queryset(self):
         return SampleModelChild.all()
+
+
+class RoutedSampleModelView(View):
+    serializer_class = CorrectSerializerThree
+    read_connection = 'replica'
+    write_connection = 'default'
+
+    def get_queryset(self):
+        return SampleModel.all()
+
+
+class SampleSyncView(View):
+    serializer_class = SampleSyncSerializer
+    sync_field = 'updated'
+    tombstone_model = SampleTombstone
+    filter_fields = {
+        'name': ('exact',),
+    }
+
+    def get_queryset(self):
+        return SampleSyncModel.all()
@@ -1,12 +1,17 @@
 import asyncio
 import datetime
+import json
 
+from starlette.datastructures import Headers, QueryParams
 from tortoise import Tortoise
+from tortoise.utils import get_schema_sql
 
 from tests.fixtures import (
     SampleModel,
     SampleModelChild,
     SampleModelGroups,
+    SampleSyncModel,
+    SampleTombstone,
 )
 
 
@@ -71,6 +76,8 @@ class DBHandler:
         await SampleModel.all().delete()
         await SampleModelChild.all().delete()
         await SampleModelGroups.all().delete()
+        await SampleSyncModel.all().delete()
+        await SampleTombstone.all().delete()
 
     @classmethod
     async def open_db(cls):
@@ -83,14 +90,131 @@ class DBHandler:
         await Tortoise.close_connections()
 
 
+class RoutingDBHandler(DBHandler):
+    REPLICA_CONNECTION = 'replica'
+
+    @classmethod
+    async def open_db(cls):
+        await Tortoise.init(config={
+            'connections': {
+                'default': 'sqlite://:memory1:',
+                cls.REPLICA_CONNECTION: 'sqlite://:memory:',
+            },
+            'apps': {
+                'tests': {'models': ['tests.fixtures'], 'default_connection': 'default'},
+            },
+        })
+        await Tortoise.generate_schemas()
+        await Tortoise.get_connection(cls.REPLICA_CONNECTION).execute_script(
+            get_schema_sql(Tortoise.get_connection('default'), safe=True)
+        )
+
+
 class FakeRequest:
-    def __init__(self, url_params={}, data=None):
+    def __init__(self, url_params={}, data=None, query_params=None, headers=None):
         self._url_params = url_params
         self._data = data
+        self._query_params = QueryParams(query_params or {})
+        self._headers = Headers(headers=headers or {})
 
     @property
     def path_params(self):
         return self._url_params
 
+    @property
+    def query_params(self):
+        return self._query_params
+
+    @property
+    def headers(self):
+        return self._headers
+
     async def json(self):
         return self._data
+
+
+class FakeResponse:
+    def __init__(self, messages):
+        start_message = next(message for message in messages
+                             if message['type'] == 'http.response.start')
+        self.messages = messages
+        self.status_code = start_message['status']
+        self.headers = {key.decode(): value.decode() for key, value in start_message['headers']}
+        self.body = b''.join(message.get('body', b'') for message in messages
+                             if message['type'] == 'http.response.body')
+
+    def json(self):
+        return json.loads(self.body.decode())
+
+
+async def call_view(view_class, method='GET', path_params=None, query_string=b'',
+                    body=b'', headers=(), disconnect_after_body=False, disconnect_delay=None):
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': '/',
+        'path_params': path_params or {},
+        'query_string': query_string,
+        'headers': [(key.encode(), value.encode()) for key, value in headers],
+    }
+    body_chunks = body if isinstance(body, list) else [body]
+    request_messages = [
+        {'type': 'http.request', 'body': chunk, 'more_body': index < len(body_chunks) - 1}
+        for index, chunk in enumerate(body_chunks)
+    ]
+    response_messages = []
+    response_body_sent = asyncio.Event()
+
+    async def receive():
+        if request_messages:
+            return request_messages.pop(0)
+
+        if disconnect_after_body:
+            await response_body_sent.wait()
+            return {'type': 'http.disconnect'}
+
+        if disconnect_delay is not None:
+            await asyncio.sleep(disconnect_delay)
+            return {'type': 'http.disconnect'}
+
+        await asyncio.Event().wait()
+
+    async def send(message):
+        response_messages.append(message)
+        if message['type'] == 'http.response.body':
+            response_body_sent.set()
+
+    await view_class(scope, receive, send)
+
+    return FakeResponse(response_messages)
+
+
+class QueryCounter:
+    def __init__(self, connection_name='default'):
+        self._connection_name = connection_name
+        self.queries = []
+
+    EXECUTE_METHODS = ('execute_query', 'execute_query_dict')
+
+    def _count(self, execute):
+        async def counting_execute(query, *args, **kwargs):
+            self.queries.append(query)
+            return await execute(query, *args, **kwargs)
+
+        return counting_execute
+
+    def __enter__(self):
+        connection = Tortoise.get_connection(self._connection_name)
+        for method_name in self.EXECUTE_METHODS:
+            setattr(connection, method_name, self._count(getattr(connection, method_name)))
+
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        connection = Tortoise.get_connection(self._connection_name)
+        for method_name in self.EXECUTE_METHODS:
+            delattr(connection, method_name)
+
+    @property
+    def count(self):
+        return len(self.queries)
@@ -1,9 +1,14 @@
 import asyncio
+import datetime
 import json
+import time
 import unittest
+from unittest import mock
+
+from tortoise import Tortoise
 
 from async_easy_utils.serializer import Serializer
-from async_easy_utils.serializer.exceptions import ValidationError
+from async_easy_utils.serializer.exceptions import InvalidSerializer, ValidationError
 from async_easy_utils.serializer.fields import (
     IntegerField,
     StringField,
@@ -11,8 +16,22 @@ from async_easy_utils.serializer.fields import (
     DateTimeField,
     MethodField,
 )
-from async_easy_utils.serializer.fields import SlugRelatedField
+from async_easy_utils.serializer.fields import AggregateField, NestedField, SlugRelatedField
+from async_easy_utils.utils import bounded_map
 from async_easy_utils.view import View
+from async_easy_utils.view.admission import AdmissionController, PriorityLane
+from async_easy_utils.view.blobs import RangeNotSatisfiable, parse_range
+from async_easy_utils.view.coalescer import WriteCoalescer
+from async_easy_utils.view.events import (
+    DISCONNECT,
+    DROP_NEWEST,
+    EventBroker,
+    EventStreamEndpoint,
+    EventWebSocketEndpoint,
+    get_model_name,
+)
+from async_easy_utils.view.filters import QueryFilter
+from async_easy_utils.view.renderers import JSONRenderer, parse_accept
 from tests.fixtures import (
     SampleModel,
     SampleModelChild,
@@ -23,10 +42,28 @@ from tests.fixtures import (
     SampleModelView,
     SampleModelGroups,
     CorrectSerializerFive,
+    CorrectSerializerThree,
+    SampleModelChildView,
+    SampleModelChildBlobSerializer,
+    SampleModelChildBlobView,
+    NestedChildSerializer,
+    NestedChildWithParentSerializer,
+    NestedGroupSerializer,
+    NestedGroupView,
+    SampleModelStatsSerializer,
+    SampleModelStatsView,
+    RoutedSampleModelView,
+    SampleSyncModel,
+    SampleSyncSerializer,
+    SampleSyncView,
+    SampleTombstone,
 )
 from tests.helpers import (
     DBHandler,
     FakeRequest,
+    QueryCounter,
+    RoutingDBHandler,
+    call_view,
 )
 
 
@@ -271,10 +308,9 @@ class TestSerializer(unittest.TestCase):
             'sample_model': 'sample_model',
         }
 
-        serializer = CorrectSerializerTwo(data=input_data)
-        serializer._check_input_data_for_primary_key()
+        errors = CorrectSerializerTwo.check_input_keys(input_data)
 
-        assert serializer.errors == {'id': 'primary key, cannot be in input'}
+        assert errors == {'id': 'primary key, cannot be in input'}
 
     def test_check_input_data_if_read_only_in_input(self):
         input_data = {
@@ -285,10 +321,9 @@ class TestSerializer(unittest.TestCase):
             'sample_model': 'sample_model',
         }
 
-        serializer = CorrectSerializerTwo(data=input_data)
-        serializer._check_input_data_for_read_only_values()
+        errors = CorrectSerializerTwo.check_input_keys(input_data)
 
-        assert serializer.errors == {'created': 'field is read only'}
+        assert errors == {'created': 'field is read only'}
 #
     def test_check_input_data_if_serialized_method_in_input(self):
         input_data = {
@@ -299,10 +334,9 @@ class TestSerializer(unittest.TestCase):
             'sample_model': 'sample_model',
         }
 
-        serializer = CorrectSerializerTwo(data=input_data)
-        serializer._check_input_data_for_read_only_values()
+        errors = CorrectSerializerTwo.check_input_keys(input_data)
 
-        assert serializer.errors == {'ser_test': 'field is read only'}
+        assert errors == {'ser_test': 'field is read only'}
 
     def test_check_input_data_if_missing_input(self):
         input_data = {
@@ -311,10 +345,9 @@ class TestSerializer(unittest.TestCase):
             'sample_model': 'sample_model',
         }
 
-        serializer = CorrectSerializerTwo(data=input_data)
-        serializer._check_input_data_for_missing_values()
+        errors = CorrectSerializerTwo.check_input_keys(input_data)
 
-        assert serializer.errors == {'number': 'missing in input'}
+        assert errors == {'number': 'missing in input'}
 
     def test_check_input_data_for_valid_input(self):
         input_data = {
@@ -324,10 +357,9 @@ class TestSerializer(unittest.TestCase):
             'sample_model': 'sample_model',
         }
 
-        serializer = CorrectSerializerTwo(data=input_data)
-        serializer._check_input_data_for_missing_values()
+        errors = CorrectSerializerTwo.check_input_keys(input_data)
 
-        assert not serializer.errors
+        assert not errors
 
     def test_serializer_is_valid_for_invalid_data(self):
         with DBHandler():
@@ -349,8 +381,14 @@ class TestSerializer(unittest.TestCase):
             is_valid = asyncio.get_event_loop().run_until_complete(serializer.is_valid())
 
             assert not is_valid
-            assert serializer.errors == {'number': 'incorrect value, cannot transform to integer',
-                                         'sample_model': 'name number 1 does not exists'}
+            assert serializer.errors == {'number': 'incorrect value, cannot transform to integer'}
+
+            input_data['number'] = 1
+            serializer = CorrectSerializerTwo(data=input_data)
+            is_valid = asyncio.get_event_loop().run_until_complete(serializer.is_valid())
+
+            assert not is_valid
+            assert serializer.errors == {'sample_model': 'name number 1 does not exists'}
 
     def test_serializer_is_valid_for_valid_data(self):
         with DBHandler():
@@ -515,6 +553,49 @@ class TestViewMeta(unittest.TestCase):
 
             assert MissingSerializerClassView
 
+    def test_incorrect_filter_fields_in_view(self):
+        with self.assertRaises(ValueError):
+            class IncorrectFilterFieldView(View):
+                serializer_class = CorrectSerializerThree
+                filter_fields = {'incorrect_value': ('exact',)}
+
+                def get_queryset(self):
+                    return SampleModel.all()
+
+            assert IncorrectFilterFieldView
+
+        with self.assertRaises(ValueError):
+            class IncorrectFilterLookupView(View):
+                serializer_class = CorrectSerializerThree
+                filter_fields = {'name': ('regex',)}
+
+                def get_queryset(self):
+                    return SampleModel.all()
+
+            assert IncorrectFilterLookupView
+
+    def test_incorrect_ordering_fields_in_view(self):
+        with self.assertRaises(ValueError):
+            class IncorrectOrderingFieldView(View):
+                serializer_class = CorrectSerializerTwo
+                ordering_fields = ('ser_test',)
+
+                def get_queryset(self):
+                    return SampleModelChild.all()
+
+            assert IncorrectOrderingFieldView
+
+    def test_incorrect_list_concurrency_in_view(self):
+        with self.assertRaises(ValueError):
+            class IncorrectListConcurrencyView(View):
+                serializer_class = CorrectSerializerThree
+                list_concurrency = 0
+
+                def get_queryset(self):
+                    return SampleModel.all()
+
+            assert IncorrectListConcurrencyView
+
 
 class TestView(unittest.TestCase):
     def setUp(self):
@@ -667,5 +748,2352 @@ class TestView(unittest.TestCase):
                 SampleModel.filter(id=sample_model.id)) == []
 
 
+class TestViewFiltering(unittest.TestCase):
+    def setUp(self):
+        self.sample_model_child_view = SampleModelChildView({'type': 'http'}, None, None)
+
+    def get_list(self, query_params):
+        response = asyncio.get_event_loop().run_until_complete(
+            self.sample_model_child_view.list(FakeRequest(query_params=query_params)))
+
+        return response.status_code, json.loads(response.body.decode())
+
+    def test_filter_list(self):
+        with DBHandler():
+            status_code, response_data = self.get_list({'number__gte': '2', 'number__lte': '3'})
+
+            assert status_code == 200
+            assert sorted(child['number'] for child in response_data) == [2, 3]
+
+            status_code, response_data = self.get_list({'name__icontains': 'CHILD_1'})
+
+            assert [child['name'] for child in response_data] == ['child_1']
+
+    def test_filter_list_by_related_field(self):
+        with DBHandler():
+            status_code, response_data = self.get_list({'sample_model': 'model_1'})
+
+            assert status_code == 200
+            assert sorted(child['name'] for child in response_data) == ['child_1', 'child_4']
+
+            status_code, response_data = self.get_list({'sample_model__in': 'model_2,model_3'})
+
+            assert sorted(child['name'] for child in response_data) == ['child_2', 'child_3']
+
+    def test_filter_list_by_unknown_related_slug(self):
+        with DBHandler():
+            status_code, response_data = self.get_list({'sample_model': 'not existing'})
+
+            assert status_code == 200
+            assert response_data == []
+
+            status_code, response_data = self.get_list(
+                {'sample_model__in': 'model_2,not existing'})
+
+            assert [child['name'] for child in response_data] == ['child_2']
+
+    def test_filter_by_related_slug_runs_no_lookup_queries(self):
+        query_filter = QueryFilter(CorrectSerializerTwo, SampleModelChildView.filter_fields)
+        with DBHandler():
+            with QueryCounter() as query_counter:
+                queryset, errors = asyncio.get_event_loop().run_until_complete(
+                    query_filter.filter_queryset(SampleModelChild.all(),
+                                                 {'sample_model__in': 'model_2,model_3'}))
+
+            assert errors is None
+            assert query_counter.count == 0
+            assert sorted(asyncio.get_event_loop().run_until_complete(
+                queryset.values_list('name', flat=True))) == ['child_2', 'child_3']
+
+    def test_filter_list_with_ordering(self):
+        with DBHandler():
+            status_code, response_data = self.get_list({'number__in': '1,2,4',
+                                                        'ordering': '-number'})
+
+            assert status_code == 200
+            assert [child['number'] for child in response_data] == [4, 2, 1]
+
+    def test_filter_list_for_invalid_params(self):
+        with DBHandler():
+            status_code, response_data = self.get_list({'created': '1990-01-01 11:01:01',
+                                                        'number__gt': '1',
+                                                        'number': 'aaa',
+                                                        'ordering': 'created'})
+
+            assert status_code == 400
+            assert response_data == {
+                'detail': {
+                    'created': 'filtering not allowed',
+                    'number__gt': 'filtering not allowed',
+                    'number': 'incorrect value, cannot transform to integer',
+                    'ordering': 'ordering not allowed',
+                }
+            }
+
+
+class TestBoundedMap(unittest.TestCase):
+    def test_bounded_map_limits_concurrency(self):
+        running = []
+        max_running = []
+
+        async def double(value):
+            running.append(value)
+            max_running.append(len(running))
+            await asyncio.sleep(0.001)
+            running.remove(value)
+
+            return value * 2
+
+        results = asyncio.get_event_loop().run_until_complete(
+            bounded_map(double, list(range(50)), concurrency=5))
+
+        assert results == [value * 2 for value in range(50)]
+        assert max(max_running) == 5
+
+    def test_bounded_map_for_empty_items(self):
+        results = asyncio.get_event_loop().run_until_complete(
+            bounded_map(asyncio.sleep, [], concurrency=5))
+
+        assert results == []
+
+
+class TestViewDispatch(unittest.TestCase):
+    def test_dispatch_list(self):
+        with DBHandler():
+            response = asyncio.get_event_loop().run_until_complete(call_view(SampleModelView))
+            sample_models = asyncio.get_event_loop().run_until_complete(SampleModel.all())
+
+            assert response.status_code == 200
+            assert response.json() == [{'id': sample_model.id, 'name': sample_model.name}
+                                       for sample_model in sample_models]
+
+    def test_dispatch_instance(self):
+        with DBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(SampleModel.first())
+            response = asyncio.get_event_loop().run_until_complete(
+                call_view(SampleModelView, path_params={'id': sample_model.id}))
+
+            assert response.status_code == 200
+            assert response.json() == {'id': sample_model.id, 'name': sample_model.name}
+
+    def test_dispatch_head(self):
+        with DBHandler():
+            response = asyncio.get_event_loop().run_until_complete(
+                call_view(SampleModelView, method='HEAD'))
+
+            assert response.status_code == 200
+
+    def test_dispatch_table(self):
+        assert SampleModelView.dispatch_table[('GET', 'list')] == (
+            'list', SampleModelView.list, True)
+        assert SampleModelView.dispatch_table[('HEAD', 'instance')] == (
+            'instance', SampleModelView.instance, True)
+        assert ('POST', 'instance') not in SampleModelView.dispatch_table
+
+    def test_dispatch_not_allowed_method(self):
+        queryset_calls = []
+
+        class NotAllowedSampleModelView(View):
+            serializer_class = CorrectSerializerThree
+
+            def get_queryset(self):
+                queryset_calls.append(True)
+                return SampleModel.all()
+
+        response = asyncio.get_event_loop().run_until_complete(
+            call_view(NotAllowedSampleModelView, method='POST', path_params={'id': 1}))
+
+        assert response.status_code == 405
+        assert response.json() == {'detail': 'Method POST not allowed.'}
+        assert queryset_calls == []
+
+
+class TestViewSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        calls = self.calls
+
+        class SingleFlightView(View):
+            serializer_class = CorrectSerializerThree
+            filter_fields = {'name': ('exact',)}
+            single_flight = True
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+            async def list(self, request):
+                calls.append(request.query_params.get('name'))
+                await asyncio.sleep(0.01)
+                if request.query_params.get('name') == 'error':
+                    raise RuntimeError('list error')
+
+                return await super().list(request)
+
+        self.view_class = SingleFlightView
+
+    def call_views(self, *query_strings):
+        return asyncio.get_event_loop().run_until_complete(asyncio.gather(
+            *[call_view(self.view_class, query_string=query_string)
+              for query_string in query_strings],
+            return_exceptions=True,
+        ))
+
+    def test_identical_requests_share_response(self):
+        with DBHandler():
+            responses = self.call_views(*[b''] * 10)
+
+            assert len(self.calls) == 1
+            assert all(response.body == responses[0].body for response in responses)
+            assert len(responses[0].json()) == 3
+            assert self.view_class.single_flight_group.in_flight == 0
+
+    def test_different_requests_are_not_shared(self):
+        with DBHandler():
+            self.call_views(b'', b'name=model_1', b'name=model_1')
+
+            assert len(self.calls) == 2
+            assert set(self.calls) == {None, 'model_1'}
+
+    def call_views_with_headers(self, *headers):
+        return asyncio.get_event_loop().run_until_complete(asyncio.gather(
+            *[call_view(self.view_class, headers=request_headers) for request_headers in headers]
+        ))
+
+    def test_different_callers_are_not_shared(self):
+        with DBHandler():
+            self.call_views_with_headers(
+                (('authorization', 'Bearer first'),),
+                (('authorization', 'Bearer second'),),
+                (('authorization', 'Bearer second'),),
+            )
+
+            assert len(self.calls) == 2
+
+    def test_single_flight_caller_key_hook(self):
+        self.view_class.get_single_flight_caller_key = \
+            lambda view, request: request.cookies.get('session')
+
+        with DBHandler():
+            self.call_views_with_headers(
+                (('cookie', 'session=first'),),
+                (('cookie', 'session=second'),),
+                (('cookie', 'session=second'),),
+            )
+
+            assert len(self.calls) == 2
+
+    def test_error_is_shared_and_not_cached(self):
+        with DBHandler():
+            responses = self.call_views(b'name=error', b'name=error')
+
+            assert len(self.calls) == 1
+            assert all(isinstance(response, RuntimeError) for response in responses)
+
+            self.call_views(b'name=error')
+
+            assert len(self.calls) == 2
+
+    def test_computation_survives_single_waiter_cancellation(self):
+        async def cancel_first_waiter():
+            first = asyncio.ensure_future(call_view(self.view_class))
+            second = asyncio.ensure_future(call_view(self.view_class))
+            await asyncio.sleep(0.001)
+            first.cancel()
+
+            return await asyncio.gather(first, second, return_exceptions=True)
+
+        with DBHandler():
+            first, second = asyncio.get_event_loop().run_until_complete(cancel_first_waiter())
+
+            assert isinstance(first, asyncio.CancelledError)
+            assert second.status_code == 200
+            assert len(self.calls) == 1
+
+    def test_computation_cancelled_without_waiters(self):
+        async def cancel_all_waiters():
+            waiter = asyncio.ensure_future(call_view(self.view_class))
+            await asyncio.sleep(0.001)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+
+            return self.view_class.single_flight_group.in_flight
+
+        with DBHandler():
+            in_flight = asyncio.get_event_loop().run_until_complete(cancel_all_waiters())
+
+            assert in_flight == 0
+
+
+class TestViewInstanceLoader(unittest.TestCase):
+    def setUp(self):
+        class BatchedSampleModelView(View):
+            serializer_class = CorrectSerializerThree
+            batch_instance_lookups = True
+            instance_loader_max_batch_size = 3
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+        self.view_class = BatchedSampleModelView
+        self.batches = []
+        resolve = self.view_class.instance_loader._resolve
+
+        async def counting_resolve(queryset, pending):
+            self.batches.append(sorted(pending.keys()))
+            await resolve(queryset, pending)
+
+        self.view_class.instance_loader._resolve = counting_resolve
+
+    def get_instances(self, pks):
+        view = self.view_class({'type': 'http'}, None, None)
+
+        return asyncio.get_event_loop().run_until_complete(
+            asyncio.gather(*[view.get_instance_from_pk(pk) for pk in pks]))
+
+    def test_concurrent_lookups_are_batched(self):
+        with DBHandler():
+            sample_models = asyncio.get_event_loop().run_until_complete(
+                SampleModel.all().order_by('id'))
+            pks = [str(sample_models[0].id), str(sample_models[1].id), str(sample_models[0].id)]
+            instances = self.get_instances(pks)
+
+            assert self.batches == [[sample_models[0].id, sample_models[1].id]]
+            assert [instance.id for instance in instances] == [int(pk) for pk in pks]
+
+    def test_missing_and_invalid_pks(self):
+        with DBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(SampleModel.first())
+            instances = self.get_instances([sample_model.id, 'invalid id', 100000])
+
+            assert instances[0].id == sample_model.id
+            assert instances[1:] == [None, None]
+            assert len(self.batches) == 1
+
+    def test_batch_is_flushed_when_full(self):
+        with DBHandler():
+            sample_models = asyncio.get_event_loop().run_until_complete(SampleModel.all())
+            instances = self.get_instances(
+                [sample_model.id for sample_model in sample_models] + [100000])
+
+            assert len(self.batches) == 2
+            assert [instance.id for instance in instances[:3]] == [
+                sample_model.id for sample_model in sample_models]
+
+    def test_instance_view_with_batched_lookups(self):
+        with DBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(SampleModel.first())
+            response = asyncio.get_event_loop().run_until_complete(
+                call_view(self.view_class, path_params={'id': str(sample_model.id)}))
+
+            assert response.json() == {'id': sample_model.id, 'name': sample_model.name}
+
+    def test_instance_and_default_querysets_are_not_batched_together(self):
+        with DBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(SampleModel.first())
+            view = self.view_class({'type': 'http'}, None, None)
+            asyncio.get_event_loop().run_until_complete(asyncio.gather(
+                view.get_instance_from_pk(sample_model.id),
+                view.get_instance_from_pk(
+                    sample_model.id, queryset=view.queryset, queryset_kind='annotated'),
+            ))
+
+            assert self.batches == [[sample_model.id], [sample_model.id]]
+
+    def test_instance_loader_key_hook(self):
+        self.view_class.get_instance_loader_key = lambda view: view.scope['tenant']
+        with DBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(SampleModel.first())
+            asyncio.get_event_loop().run_until_complete(asyncio.gather(*[
+                self.view_class({'type': 'http', 'tenant': tenant}, None, None)
+                .get_instance_from_pk(sample_model.id)
+                for tenant in ('first', 'second')
+            ]))
+
+            assert self.batches == [[sample_model.id], [sample_model.id]]
+
+    def test_request_scoped_querysets_are_not_batched_together(self):
+        class TenantSampleModelView(View):
+            serializer_class = CorrectSerializerThree
+            batch_instance_lookups = True
+
+            def get_queryset(self):
+                return SampleModel.filter(name=self.scope['tenant'])
+
+        with DBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(
+                SampleModel.get(name='model_1'))
+            instances = asyncio.get_event_loop().run_until_complete(asyncio.gather(*[
+                TenantSampleModelView({'type': 'http', 'tenant': tenant}, None, None)
+                .get_instance_from_pk(sample_model.id)
+                for tenant in ('model_1', 'model_2')
+            ]))
+
+            assert instances[0].id == sample_model.id
+            assert instances[1] is None
+
+
+class TestViewRendering(unittest.TestCase):
+    def setUp(self):
+        self.sample_model_view = SampleModelView({'type': 'http'}, None, None)
+        self.renderer = JSONRenderer(serializer_class=CorrectSerializerThree)
+
+    def render_rows(self, rows):
+        return asyncio.get_event_loop().run_until_complete(
+            self.sample_model_view.render_rows(self.renderer, rows))
+
+    def test_render_rows_matches_json_encoding(self):
+        for rows_count in (0, 1, 499, 500, 501, 1200):
+            rows = [[index, f'nąme {index}'] for index in range(rows_count)]
+
+            assert json.loads(self.render_rows(rows).decode()) == [
+                {'id': index, 'name': name} for index, name in rows]
+
+    def test_small_payload_rendered_inline(self):
+        rows = [[index, 'name'] for index in range(600)]
+        with mock.patch('async_easy_utils.view.run_in_executor') as run_in_executor:
+            self.render_rows(rows)
+
+            assert not run_in_executor.called
+
+    def test_large_payload_rendered_in_executor(self):
+        rows = [[index, 'x' * 4000] for index in range(600)]
+        self.sample_model_view.render_offload_min_rows = 10000
+
+        async def fake_run_in_executor(executor, func, *args):
+            return func(*args)
+
+        with mock.patch('async_easy_utils.view.run_in_executor',
+                        side_effect=fake_run_in_executor) as run_in_executor:
+            assert len(json.loads(self.render_rows(rows).decode())) == len(rows)
+            assert run_in_executor.call_args[0][0] is SampleModelView.render_executor
+
+    def test_loop_responsive_during_large_render(self):
+        rows = [[index, f'name {index}'] for index in range(300000)]
+
+        async def render_with_ticker():
+            ticks = []
+            render = asyncio.ensure_future(
+                self.sample_model_view.render_rows(self.renderer, rows))
+            while not render.done():
+                ticks.append(True)
+                await asyncio.sleep(0.001)
+
+            return ticks, await render
+
+        ticks, body = asyncio.get_event_loop().run_until_complete(render_with_ticker())
+
+        assert len(ticks) > 1
+        assert len(json.loads(body.decode())) == len(rows)
+
+
+class TestViewContentNegotiation(unittest.TestCase):
+    def setUp(self):
+        self.sample_model_child_view = SampleModelChildView({'type': 'http'}, None, None)
+
+    def get_list(self, query_params=None, headers=None):
+        return asyncio.get_event_loop().run_until_complete(
+            self.sample_model_child_view.list(
+                FakeRequest(query_params=query_params, headers=headers)))
+
+    def get_children(self):
+        return asyncio.get_event_loop().run_until_complete(
+            SampleModelChild.all().prefetch_related('sample_model'))
+
+    def test_parse_accept(self):
+        assert parse_accept('text/html;q=0.5, application/json, */*;q=0.1, image/png;q=0') == [
+            ('application/json', {}),
+            ('text/html', {}),
+            ('*/*', {}),
+        ]
+        assert parse_accept('application/vnd.columnar+json; dictionary=true') == [
+            ('application/vnd.columnar+json', {'dictionary': 'true'}),
+        ]
+
+    def test_default_renderer(self):
+        with DBHandler():
+            for headers in (None, {'accept': '*/*'}, {'accept': 'text/html, application/*'}):
+                response = self.get_list(headers=headers)
+
+                assert response.media_type == 'application/json'
+                assert len(json.loads(response.body.decode())) == 4
+
+    def test_columnar_renderer(self):
+        with DBHandler():
+            response = self.get_list(query_params={'format': 'columnar', 'ordering': 'number'})
+            response_data = json.loads(response.body.decode())
+
+            assert response.media_type == 'application/vnd.columnar+json'
+            assert response.headers['vary'] == 'Accept'
+            assert response_data['fields'] == list(CorrectSerializerTwo.fields.keys())
+            assert [row[2] for row in response_data['rows']] == [1, 2, 3, 4]
+            assert 'dictionaries' not in response_data
+
+    def test_columnar_renderer_with_dictionary(self):
+        with DBHandler():
+            response = self.get_list(
+                query_params={'ordering': 'number'},
+                headers={'accept': 'application/vnd.columnar+json; dictionary=true'})
+            response_data = json.loads(response.body.decode())
+            children = sorted(self.get_children(), key=lambda child: child.number)
+            dictionaries = response_data['dictionaries']
+
+            assert set(dictionaries) == {'name', 'sample_model'}
+            assert dictionaries['sample_model'] == ['model_1', 'model_2', 'model_3']
+
+            for row, child in zip(response_data['rows'], children):
+                assert row[0] == str(child.id)
+                assert dictionaries['name'][row[1]] == child.name
+                assert dictionaries['sample_model'][row[5]] == child.sample_model.name
+
+    def test_not_acceptable(self):
+        with DBHandler():
+            for query_params, headers in (({'format': 'xml'}, None),
+                                          (None, {'accept': 'text/html'})):
+                response = self.get_list(query_params=query_params, headers=headers)
+
+                assert response.status_code == 406
+                assert json.loads(response.body.decode()) == {'detail': 'not acceptable'}
+
+
+class TestViewExport(unittest.TestCase):
+    def get_children(self):
+        return asyncio.get_event_loop().run_until_complete(
+            SampleModelChild.all().order_by('id'))
+
+    def export(self, query_string, view_class=SampleModelChildView, **kwargs):
+        return asyncio.get_event_loop().run_until_complete(
+            call_view(view_class, query_string=query_string, **kwargs))
+
+    def test_ndjson_export(self):
+        with DBHandler():
+            response = self.export(b'format=ndjson')
+            rows = [json.loads(line) for line in response.body.decode().splitlines()]
+
+            assert response.status_code == 200
+            assert response.headers['content-type'] == 'application/x-ndjson'
+            assert [row['id'] for row in rows] == [str(child.id) for child in self.get_children()]
+            assert set(rows[0]) == set(CorrectSerializerTwo.fields.keys())
+
+    def test_csv_export_with_filter_and_ordering(self):
+        with DBHandler():
+            response = self.export(b'format=csv&ordering=-number&number__in=1,2,3,4')
+            lines = response.body.decode().splitlines()
+
+            assert response.headers['content-type'].startswith('text/csv')
+            assert lines[0] == ','.join(CorrectSerializerTwo.fields.keys())
+            assert [line.split(',')[2] for line in lines[1:]] == ['4', '3', '2', '1']
+
+    def test_export_iterates_queryset_in_chunks(self):
+        with DBHandler():
+            view = SampleModelChildView({'type': 'http'}, None, None)
+
+            async def get_chunks(ordering):
+                return [[instance.number for instance in instances]
+                        async for instances in view.iterate_queryset(view.queryset, ordering)]
+
+            chunks = asyncio.get_event_loop().run_until_complete(get_chunks(['-number']))
+            assert chunks == [[4, 3, 2], [1]]
+
+            chunks = asyncio.get_event_loop().run_until_complete(get_chunks([]))
+            assert [len(chunk) for chunk in chunks] == [3, 1]
+
+    def test_export_stops_on_client_disconnect(self):
+        chunks = []
+
+        class DisconnectSampleModelChildView(SampleModelChildView):
+            serializer_class = CorrectSerializerTwo
+            export_chunk_size = 1
+
+            def get_queryset(self):
+                return SampleModelChild.all()
+
+            async def iterate_queryset(self, queryset, ordering):
+                async for instances in super().iterate_queryset(queryset, ordering):
+                    chunks.append(instances)
+                    yield instances
+
+        with DBHandler():
+            response = self.export(b'format=ndjson', view_class=DisconnectSampleModelChildView,
+                                   disconnect_after_body=True)
+
+            assert response.status_code == 200
+            assert len(chunks) < 4
+
+
+class TestViewIngest(unittest.TestCase):
+    def ingest(self, body, view_class=SampleModelChildView,
+               content_type='application/x-ndjson'):
+        return asyncio.get_event_loop().run_until_complete(
+            call_view(view_class, method='POST', body=body,
+                      headers=[('content-type', content_type)]))
+
+    @staticmethod
+    def get_line(name, number, sample_model='model_1'):
+        return json.dumps({'name': name, 'number': number, 'data': 'data',
+                           'sample_model': sample_model}).encode()
+
+    def test_ingest(self):
+        with DBHandler():
+            lines = [self.get_line(f'ingested_{index}', index) for index in range(5)]
+            body = b'\n'.join(lines) + b'\n'
+            response = self.ingest([body[:10], body[10:77], body[77:]])
+            ingested = asyncio.get_event_loop().run_until_complete(
+                SampleModelChild.filter(name__startswith='ingested_').order_by('number'))
+
+            assert response.status_code == 200
+            assert response.json() == {'accepted': [1, 2, 3, 4, 5], 'rejected': {}}
+            assert [child.number for child in ingested] == [0, 1, 2, 3, 4]
+
+    def test_ingest_rejected_lines(self):
+        with DBHandler():
+            body = b'\n'.join((
+                self.get_line('ingested_1', 1),
+                b'not json',
+                b'',
+                self.get_line('ingested_2', 'aaa'),
+                b'[1, 2]',
+                self.get_line('ingested_3', 3, sample_model='not existing'),
+                self.get_line('ingested_4', 4),
+            ))
+            response = self.ingest(body)
+
+            assert response.json() == {
+                'accepted': [1, 7],
+                'rejected': {
+                    '2': 'invalid json',
+                    '4': {'number': 'incorrect value, cannot transform to integer'},
+                    '5': 'line must be not empty json object',
+                    '6': {'sample_model': 'not existing does not exists'},
+                }
+            }
+            assert asyncio.get_event_loop().run_until_complete(
+                SampleModelChild.filter(name__startswith='ingested_').count()) == 2
+
+    def test_ingest_failed_batch_saved_row_by_row(self):
+        bulk_save = CorrectSerializerTwo.bulk_save
+
+        async def failing_bulk_save(serializers, **kwargs):
+            if any(serializer.validated_data['name'] == 'broken' for serializer in serializers):
+                return None
+
+            return await bulk_save(serializers, **kwargs)
+
+        with DBHandler(), mock.patch.object(CorrectSerializerTwo, 'bulk_save', failing_bulk_save):
+            body = b'\n'.join((
+                self.get_line('ingested_1', 1),
+                self.get_line('broken', 2),
+                self.get_line('ingested_3', 3),
+            ))
+            response = self.ingest(body)
+
+            assert response.json() == {
+                'accepted': [1, 3],
+                'rejected': {'2': 'cannot save instance'},
+            }
+            assert asyncio.get_event_loop().run_until_complete(
+                SampleModelChild.filter(name__startswith='ingested_').count()) == 2
+
+    def test_ingest_disabled_for_view(self):
+        with DBHandler():
+            response = self.ingest(b'{"name": "name_1"}\n{"name": "name_2"}',
+                                   view_class=SampleModelView)
+
+            assert response.status_code == 400
+            assert response.json() == {'detail': 'invalid request for create.'}
+
+    def test_ingest_not_allowed_for_m2m_serializer(self):
+        with self.assertRaises(ValueError):
+            class IngestGroupsView(View):
+                serializer_class = CorrectSerializerFour
+                bulk_ingest = True
+
+                def get_queryset(self):
+                    return SampleModelGroups.all()
+
+            assert IngestGroupsView
+
+    def test_serializer_bulk_save(self):
+        with DBHandler():
+            serializers = [CorrectSerializerTwo(data={'name': f'bulk_{index}', 'number': index,
+                                                      'data': 'data', 'sample_model': 'model_2'})
+                           for index in range(3)]
+            for serializer in serializers:
+                assert asyncio.get_event_loop().run_until_complete(serializer.is_valid())
+
+            instances = asyncio.get_event_loop().run_until_complete(
+                CorrectSerializerTwo.bulk_save(serializers))
+            serialized = asyncio.get_event_loop().run_until_complete(serializers[0].to_dict())
+
+            assert len(instances) == 3
+            assert serialized['name'] == 'bulk_0'
+
+
+class TestNestedSerializer(unittest.TestCase):
+    def get_expected_groups(self):
+        async def get_groups():
+            groups = []
+            for group in await SampleModelGroups.all():
+                sample_models = []
+                for sample_model in await group.sample_models.all():
+                    childs = [{'id': str(child.id), 'name': child.name, 'number': child.number}
+                              for child in await sample_model.childs.all()]
+                    sample_models.append({'id': sample_model.id, 'name': sample_model.name,
+                                          'childs': childs})
+                groups.append({'id': group.id, 'name': group.name,
+                               'sample_models': sample_models})
+
+            return groups
+
+        return asyncio.get_event_loop().run_until_complete(get_groups())
+
+    @staticmethod
+    def sort_groups(groups):
+        for group in groups:
+            group['sample_models'].sort(key=lambda sample_model: sample_model['id'])
+            for sample_model in group['sample_models']:
+                sample_model['childs'].sort(key=lambda child: child['number'])
+
+        return sorted(groups, key=lambda group: group['id'])
+
+    def test_incorrect_nested_field_declaration(self):
+        class NotRelationNestedSerializer(Serializer):
+            name = NestedField(serializer_class=NestedChildSerializer)
+
+            class Meta:
+                model = SampleModel
+                fields = ('id', 'name')
+
+        with DBHandler():
+            with self.assertRaises(InvalidSerializer):
+                NotRelationNestedSerializer.get_prefetch_paths()
+
+    def test_nested_field_is_read_only(self):
+        assert NestedGroupSerializer.fields['sample_models'].read_only is True
+
+    def test_prefetch_paths(self):
+        with DBHandler():
+            assert NestedGroupSerializer.get_prefetch_paths() == (
+                'sample_models', 'sample_models__childs')
+            assert CorrectSerializerTwo.get_prefetch_paths() == ('sample_model',)
+            assert CorrectSerializerThree.get_prefetch_paths() == ()
+
+    def test_nested_list_query_count_does_not_grow_with_rows(self):
+        with DBHandler():
+            view = NestedGroupView({'type': 'http'}, None, None)
+            with QueryCounter() as query_counter:
+                response = asyncio.get_event_loop().run_until_complete(
+                    view.list(FakeRequest()))
+
+            assert query_counter.count == 3
+            assert self.sort_groups(json.loads(response.body.decode())) == \
+                self.sort_groups(self.get_expected_groups())
+
+            async def add_rows():
+                for index in range(5):
+                    sample_model = await SampleModel.create(name=f'extra_{index}')
+                    await SampleModelChild.create(name=f'extra_child_{index}', number=index,
+                                                  data=b'', sample_model=sample_model)
+                    group = await SampleModelGroups.create(name=f'extra_group_{index}')
+                    await group.sample_models.add(sample_model)
+
+            asyncio.get_event_loop().run_until_complete(add_rows())
+            view = NestedGroupView({'type': 'http'}, None, None)
+            with QueryCounter() as query_counter:
+                response = asyncio.get_event_loop().run_until_complete(
+                    view.list(FakeRequest()))
+
+            assert query_counter.count == 3
+            assert len(json.loads(response.body.decode())) == 7
+
+    def test_nested_single_field(self):
+        with DBHandler():
+            child = asyncio.get_event_loop().run_until_complete(
+                SampleModelChild.get(name='child_4'))
+            serialized = asyncio.get_event_loop().run_until_complete(
+                NestedChildWithParentSerializer(instance=child).to_dict())
+            sample_model = asyncio.get_event_loop().run_until_complete(
+                SampleModel.get(name='model_1'))
+
+            assert serialized['sample_model'] == {'id': sample_model.id, 'name': 'model_1'}
+
+    def test_slug_related_field_after_save(self):
+        with DBHandler():
+            serializer = CorrectSerializerTwo(data={'name': 'child', 'number': 1, 'data': 'data',
+                                                    'sample_model': 'model_2'})
+            asyncio.get_event_loop().run_until_complete(serializer.is_valid())
+            asyncio.get_event_loop().run_until_complete(serializer.save())
+            serialized = asyncio.get_event_loop().run_until_complete(serializer.to_dict())
+
+            assert serialized['sample_model'] == 'model_2'
+
+
+class TestAggregateField(unittest.TestCase):
+    EXPECTED_STATS = {
+        'model_1': {'childs_count': 2, 'childs_number_sum': 5, 'childs_number_max': 4,
+                    'groups_count': 2},
+        'model_2': {'childs_count': 1, 'childs_number_sum': 2, 'childs_number_max': 2,
+                    'groups_count': 1},
+        'model_3': {'childs_count': 1, 'childs_number_sum': 3, 'childs_number_max': 3,
+                    'groups_count': 1},
+    }
+
+    @staticmethod
+    def get_stats(rows):
+        return {row.pop('name'): {key: value for key, value in row.items() if key != 'id'}
+                for row in rows}
+
+    def test_incorrect_aggregate_field_declaration(self):
+        with self.assertRaises(InvalidSerializer):
+            AggregateField('median', 'childs', 'number')
+
+        with self.assertRaises(InvalidSerializer):
+            AggregateField('sum', 'childs')
+
+    def test_avg_is_not_truncated(self):
+        class AvgSerializer(Serializer):
+            groups_count = AggregateField('count', 'groups')
+            childs_number_avg = AggregateField('avg', 'childs', 'number')
+
+            class Meta:
+                model = SampleModel
+                fields = ('id', 'name', 'groups_count', 'childs_number_avg')
+
+        async def get_averages():
+            annotated = await SampleModel.filter(name='model_1').annotate(
+                **AvgSerializer.get_queryset_annotations())
+            prefetched = await SampleModel.filter(name='model_1')
+            await AvgSerializer.prefetch(prefetched)
+            plain = await SampleModel.get(name='model_1')
+
+            return [
+                (await AvgSerializer(instance=instance).to_dict())['childs_number_avg']
+                for instance in (annotated[0], prefetched[0], plain)
+            ]
+
+        with DBHandler():
+            assert asyncio.get_event_loop().run_until_complete(get_averages()) == [2.5] * 3
+
+    def test_aggregate_field_is_read_only(self):
+        field = SampleModelStatsSerializer.fields['childs_count']
+
+        assert field.read_only is True
+        assert asyncio.get_event_loop().run_until_complete(
+            field.to_internal_value(1)) == (None, 'aggregate field is read only')
+
+    def test_aggregate_field_is_not_filterable(self):
+        with self.assertRaises(ValueError):
+            class AggregateFilterView(View):
+                serializer_class = SampleModelStatsSerializer
+                filter_fields = {'childs_count': ('exact',)}
+
+                def get_queryset(self):
+                    return SampleModel.all()
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        with DBHandler():
+            view = SampleModelStatsView({'type': 'http'}, None, None)
+            with QueryCounter() as query_counter:
+                response = asyncio.get_event_loop().run_until_complete(
+                    view.list(FakeRequest()))
+
+            assert query_counter.count == 2
+            assert self.get_stats(json.loads(response.body.decode())) == self.EXPECTED_STATS
+
+            async def add_rows():
+                for index in range(5):
+                    sample_model = await SampleModel.create(name=f'extra_{index}')
+                    await SampleModelChild.create(name=f'extra_child_{index}', number=index,
+                                                  data=b'', sample_model=sample_model)
+
+            asyncio.get_event_loop().run_until_complete(add_rows())
+            view = SampleModelStatsView({'type': 'http'}, None, None)
+            with QueryCounter() as query_counter:
+                response = asyncio.get_event_loop().run_until_complete(
+                    view.list(FakeRequest()))
+
+            stats = self.get_stats(json.loads(response.body.decode()))
+            assert query_counter.count == 2
+            assert stats['extra_3'] == {'childs_count': 1, 'childs_number_sum': 3,
+                                        'childs_number_max': 3, 'groups_count': 0}
+
+    def test_filtered_list(self):
+        with DBHandler():
+            view = SampleModelStatsView({'type': 'http'}, None, None)
+            response = asyncio.get_event_loop().run_until_complete(
+                view.list(FakeRequest(query_params={'name': 'model_1'})))
+
+            assert self.get_stats(json.loads(response.body.decode())) == {
+                'model_1': self.EXPECTED_STATS['model_1']}
+
+    def test_instance(self):
+        with DBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(
+                SampleModel.get(name='model_2'))
+            view = SampleModelStatsView({'type': 'http'}, None, None)
+            with QueryCounter() as query_counter:
+                response = asyncio.get_event_loop().run_until_complete(
+                    view.instance(FakeRequest(url_params={'id': sample_model.id})))
+
+            assert query_counter.count == 2
+            assert self.get_stats([json.loads(response.body.decode())]) == {
+                'model_2': self.EXPECTED_STATS['model_2']}
+
+    def test_to_dict_without_annotations(self):
+        with DBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(
+                SampleModel.get(name='model_1'))
+            serialized = asyncio.get_event_loop().run_until_complete(
+                SampleModelStatsSerializer(instance=sample_model).to_dict())
+
+            assert self.get_stats([serialized]) == {'model_1': self.EXPECTED_STATS['model_1']}
+
+
+class TestMethodFieldCache(unittest.TestCase):
+    def setUp(self):
+        calls = self.calls = []
+
+        class CachedSerializer(Serializer):
+            label = MethodField(cache_size=2, cache_ttl=60, version_field='number')
+
+            class Meta:
+                model = SampleModelChild
+                fields = ('id', 'label')
+
+            async def get_label(self, instance):
+                calls.append(instance.pk)
+                return f'{instance.name}_{instance.number}'
+
+        self.serializer_class = CachedSerializer
+        self.field = CachedSerializer.fields['label']
+
+    def serialize(self, instance):
+        return asyncio.get_event_loop().run_until_complete(
+            self.serializer_class(instance=instance).to_dict())
+
+    def get_childs(self):
+        return asyncio.get_event_loop().run_until_complete(
+            SampleModelChild.all().order_by('number'))
+
+    def test_method_field_without_method(self):
+        with self.assertRaises(ValueError):
+            class MissingMethodSerializer(Serializer):
+                label = MethodField(cache_size=10)
+
+                class Meta:
+                    model = SampleModelChild
+                    fields = ('id', 'label')
+
+    def test_incorrect_cache_declaration(self):
+        with self.assertRaises(InvalidSerializer):
+            MethodField(cache_size=-1)
+
+        with self.assertRaises(InvalidSerializer):
+            MethodField(cache_size=1, cache_ttl=0)
+
+    def test_cache_hit(self):
+        with DBHandler():
+            child = self.get_childs()[0]
+
+            assert self.serialize(child)['label'] == 'child_1_1'
+            assert self.serialize(child)['label'] == 'child_1_1'
+            assert self.calls == [child.pk]
+            assert (self.field.cache.hits, self.field.cache.misses) == (1, 1)
+
+    def test_version_change_skips_cache(self):
+        with DBHandler():
+            child = self.get_childs()[0]
+            self.serialize(child)
+            child.number = 10
+
+            assert self.serialize(child)['label'] == 'child_1_10'
+            assert len(self.calls) == 2
+
+    def test_ttl(self):
+        with DBHandler():
+            child = self.get_childs()[0]
+            with mock.patch('async_easy_utils.utils.time') as time_mock:
+                for now in (0, 59, 61):
+                    time_mock.monotonic.return_value = now
+                    self.serialize(child)
+
+            assert len(self.calls) == 2
+
+    def test_lru_eviction(self):
+        with DBHandler():
+            child_1, child_2, child_3, _ = self.get_childs()
+            for child in (child_1, child_2, child_1, child_3, child_1, child_2):
+                self.serialize(child)
+
+            assert self.calls == [child_1.pk, child_2.pk, child_3.pk, child_2.pk]
+            assert len(self.field.cache) == 2
+
+    def test_method_field_without_cache(self):
+        with DBHandler():
+            child = self.get_childs()[0]
+            serialized = [
+                asyncio.get_event_loop().run_until_complete(
+                    CorrectSerializerTwo(instance=child).to_dict())
+                for _ in range(2)
+            ]
+
+            assert CorrectSerializerTwo.fields['ser_test'].cache is None
+            assert serialized[0]['ser_test'] == serialized[1]['ser_test'] == 'ser_test'
+
+
+class TestSerializerValidation(unittest.TestCase):
+    INPUT_DATA = {
+        'name': 'child',
+        'number': 1,
+        'data': 'data',
+        'sample_model': 'model_1',
+    }
+
+    def setUp(self):
+        events = self.events = []
+
+        class HookSerializer(Serializer):
+            sample_model = SlugRelatedField(many=False,
+                                            queryset=lambda: SampleModel.all(),
+                                            slug_field='name')
+
+            class Meta:
+                model = SampleModelChild
+                fields = ('id', 'name', 'number', 'data', 'sample_model')
+
+            async def validate_name(self, data):
+                events.append('name_start')
+                await asyncio.sleep(0.01)
+                events.append('name_end')
+
+                return data != 'forbidden'
+
+            async def validate_number(self, data):
+                events.append('number_start')
+                await asyncio.sleep(0.01)
+                events.append('number_end')
+                if data > 100:
+                    raise ValidationError('number too big')
+
+        self.serializer_class = HookSerializer
+
+    def is_valid(self, data):
+        serializer = self.serializer_class(data=data)
+        is_valid = asyncio.get_event_loop().run_until_complete(serializer.is_valid())
+
+        return is_valid, serializer
+
+    def test_field_validators_are_collected(self):
+        assert self.serializer_class.field_validators == ('name', 'number')
+        assert CorrectSerializerTwo.field_validators == ()
+
+    def test_field_validators_run_concurrently(self):
+        with DBHandler():
+            is_valid, serializer = self.is_valid(dict(self.INPUT_DATA))
+
+            assert is_valid
+            assert serializer.validated_data['sample_model'].name == 'model_1'
+            assert self.events[:2] == ['name_start', 'number_start']
+
+    def test_field_validators_errors(self):
+        with DBHandler():
+            is_valid, serializer = self.is_valid(
+                dict(self.INPUT_DATA, name='forbidden', number=101))
+
+            assert not is_valid
+            assert serializer.errors == {'name': 'validation failed',
+                                         'number': 'number too big'}
+
+    def test_invalid_data_does_not_touch_database(self):
+        with DBHandler():
+            with QueryCounter() as query_counter:
+                is_valid, serializer = self.is_valid(dict(self.INPUT_DATA, number='aaa'))
+
+            assert not is_valid
+            assert query_counter.count == 0
+            assert self.events == []
+            assert serializer.errors == {'number': 'incorrect value, cannot transform to integer'}
+
+    def test_input_keys(self):
+        assert CorrectSerializerTwo.pk_keys == {'id'}
+        assert CorrectSerializerTwo.read_only_keys == {'created', 'ser_test'}
+        assert CorrectSerializerTwo.writable_keys == {'name', 'number', 'data', 'sample_model'}
+        assert CorrectSerializerTwo.required_keys == CorrectSerializerTwo.writable_keys
+
+    def test_field_validator_named_like_input_keys_checker(self):
+        class InputKeysSerializer(Serializer):
+            class Meta:
+                model = SampleModel
+                fields = ('id', 'name', 'input_keys')
+
+            async def get_input_keys(self, instance):
+                return []
+
+            async def validate_input_keys(self, value):
+                return True
+
+        serializer = InputKeysSerializer(data={'name': 'model'})
+
+        assert asyncio.get_event_loop().run_until_complete(serializer.is_valid())
+        assert InputKeysSerializer.validate_input_keys is not InputKeysSerializer.check_input_keys
+
+    def test_input_keys_errors(self):
+        errors = CorrectSerializerTwo.check_input_keys({
+            'id': 1,
+            'created': '2020-01-01 00:00:00',
+            'name': 'child',
+            'unknown': 'value',
+        })
+
+        assert errors == {
+            'id': 'primary key, cannot be in input',
+            'created': 'field is read only',
+            'unknown': 'unknown field',
+            'number': 'missing in input',
+            'data': 'missing in input',
+            'sample_model': 'missing in input',
+        }
+
+    def test_unknown_field_in_input(self):
+        with DBHandler():
+            with QueryCounter() as query_counter:
+                is_valid, serializer = self.is_valid(dict(self.INPUT_DATA, unknown='value'))
+
+            assert not is_valid
+            assert query_counter.count == 0
+            assert serializer.errors == {'unknown': 'unknown field'}
+
+    def test_related_value_type_check(self):
+        with DBHandler():
+            with QueryCounter() as query_counter:
+                is_valid, serializer = self.is_valid(dict(self.INPUT_DATA, sample_model=['a']))
+
+            assert not is_valid
+            assert query_counter.count == 0
+            assert serializer.errors == {'sample_model': 'incorrect value, must be int or string'}
+
+
+class TestViewConnectionRouting(unittest.TestCase):
+    def setUp(self):
+        self.view_class = RoutedSampleModelView
+
+    def call(self, *args, **kwargs):
+        return asyncio.get_event_loop().run_until_complete(
+            call_view(self.view_class, *args, **kwargs))
+
+    @staticmethod
+    def get_names(response):
+        return sorted(row['name'] for row in response.json())
+
+    def test_reads_use_read_connection(self):
+        with RoutingDBHandler():
+            asyncio.get_event_loop().run_until_complete(SampleModel.create(
+                name='replica_model',
+                using_db=Tortoise.get_connection(RoutingDBHandler.REPLICA_CONNECTION)))
+            sample_model = asyncio.get_event_loop().run_until_complete(
+                SampleModel.get(name='model_1'))
+
+            assert self.get_names(self.call()) == ['replica_model']
+            assert self.call(path_params={'id': sample_model.id}).status_code == 404
+
+    def test_writes_use_write_connection_and_stick_reads_to_it(self):
+        with RoutingDBHandler():
+            response = self.call('POST', body=json.dumps({'name': 'new_model'}).encode(),
+                                 headers=(('content-type', 'application/json'),))
+            cookie = response.headers['set-cookie'].split(';')[0]
+
+            assert response.status_code == 201
+            assert cookie.startswith('read_primary_until=')
+            assert self.get_names(self.call()) == []
+            assert self.get_names(self.call(headers=(('cookie', cookie),))) == [
+                'model_1', 'model_2', 'model_3', 'new_model']
+
+    def test_expired_read_after_write_cookie(self):
+        with RoutingDBHandler():
+            cookie = f'read_primary_until={time.time() - 1}'
+
+            assert self.get_names(self.call(headers=(('cookie', cookie),))) == []
+            assert self.get_names(self.call(headers=(('cookie', 'read_primary_until=x'),))) == []
+
+    def test_failed_write_does_not_stick(self):
+        with RoutingDBHandler():
+            response = self.call('POST', body=json.dumps({'number': 1}).encode(),
+                                 headers=(('content-type', 'application/json'),))
+
+            assert response.status_code == 400
+            assert 'set-cookie' not in response.headers
+
+    def test_views_without_routing_use_default_connection(self):
+        with DBHandler():
+            response = asyncio.get_event_loop().run_until_complete(call_view(SampleModelView))
+
+            assert self.get_names(response) == ['model_1', 'model_2', 'model_3']
+            assert 'set-cookie' not in response.headers
+
+    def test_batched_lookups_are_grouped_by_connection(self):
+        class BatchedRoutedView(View):
+            serializer_class = CorrectSerializerThree
+            read_connection = 'replica'
+            batch_instance_lookups = True
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+        async def lookup(sample_model_id, headers):
+            return await call_view(BatchedRoutedView, path_params={'id': sample_model_id},
+                                   headers=headers)
+
+        with RoutingDBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(
+                SampleModel.get(name='model_1'))
+            cookie = f'read_primary_until={time.time() + 5}'
+            replica_response, primary_response = asyncio.get_event_loop().run_until_complete(
+                asyncio.gather(lookup(sample_model.id, ()),
+                               lookup(sample_model.id, (('cookie', cookie),))))
+
+            assert replica_response.status_code == 404
+            assert primary_response.json() == {'id': sample_model.id, 'name': 'model_1'}
+
+
+class TestViewDeadlines(unittest.TestCase):
+    def setUp(self):
+        serialization = self.serialization = {'started': 0, 'cancelled': 0}
+
+        class SlowSampleModelView(View):
+            serializer_class = CorrectSerializerThree
+            request_timeout = 0.05
+            action_timeouts = {'instance': 5}
+            cancel_on_disconnect = True
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+            async def serialize_instance(self, instance):
+                serialization['started'] += 1
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    serialization['cancelled'] += 1
+                    raise
+
+        self.view_class = SlowSampleModelView
+
+    def call(self, *args, **kwargs):
+        return asyncio.get_event_loop().run_until_complete(
+            call_view(self.view_class, *args, **kwargs))
+
+    def test_list_timeout(self):
+        with DBHandler():
+            response = self.call()
+
+            assert response.status_code == 504
+            assert response.json() == {'detail': 'request timeout'}
+            assert self.view_class.cancelled_requests == {('list', 'timeout'): 1}
+            assert self.serialization['started'] == self.serialization['cancelled'] == 3
+
+    def test_action_timeout_overrides_view_timeout(self):
+        with DBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(
+                SampleModel.get(name='model_1'))
+            response = self.call(path_params={'id': sample_model.id})
+
+            assert response.status_code == 200
+            assert not self.view_class.cancelled_requests
+
+    def test_client_disconnect(self):
+        self.view_class.request_timeout = None
+        with DBHandler():
+            response = self.call(disconnect_delay=0.05)
+
+            assert response.status_code == 499
+            assert self.view_class.cancelled_requests == {('list', 'disconnect'): 1}
+            assert self.serialization['started'] == self.serialization['cancelled'] == 3
+
+    def test_fast_request_is_not_cancelled(self):
+        class FastSampleModelView(View):
+            serializer_class = CorrectSerializerThree
+            request_timeout = 5
+            cancel_on_disconnect = True
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+        with DBHandler():
+            response = asyncio.get_event_loop().run_until_complete(
+                call_view(FastSampleModelView))
+
+            assert response.status_code == 200
+            assert len(response.json()) == 3
+            assert not FastSampleModelView.cancelled_requests
+
+    def test_incorrect_timeout(self):
+        with self.assertRaises(ValueError):
+            class IncorrectTimeoutView(View):
+                serializer_class = CorrectSerializerThree
+                action_timeouts = {'list': 0}
+
+                def get_queryset(self):
+                    return SampleModel.all()
+
+
+class TestAdmissionController(unittest.TestCase):
+    def run_async(self, coroutine):
+        return asyncio.get_event_loop().run_until_complete(coroutine)
+
+    def test_incorrect_limits(self):
+        with self.assertRaises(ValueError):
+            AdmissionController(max_in_flight=0)
+
+        with self.assertRaises(ValueError):
+            AdmissionController(max_in_flight=1, max_queued=-1)
+
+    def test_queue_and_reject(self):
+        async def scenario():
+            controller = AdmissionController(max_in_flight=1, max_queued=1)
+            assert await controller.acquire()
+
+            queued = asyncio.ensure_future(controller.acquire())
+            await asyncio.sleep(0)
+            assert (controller.in_flight, controller.queued) == (1, 1)
+            assert not await controller.acquire()
+            assert controller.rejected == 1
+
+            controller.release()
+            assert await queued
+            assert (controller.in_flight, controller.queued) == (1, 0)
+
+            controller.release()
+            assert (controller.in_flight, controller.queued) == (0, 0)
+
+        self.run_async(scenario())
+
+    def test_cancelled_waiter_leaves_queue(self):
+        async def scenario():
+            controller = AdmissionController(max_in_flight=1, max_queued=2)
+            await controller.acquire()
+            queued = asyncio.ensure_future(controller.acquire())
+            await asyncio.sleep(0)
+            queued.cancel()
+            await asyncio.gather(queued, return_exceptions=True)
+
+            assert controller.queued == 0
+            controller.release()
+            assert controller.in_flight == 0
+
+        self.run_async(scenario())
+
+
+class TestViewAdmission(unittest.TestCase):
+    def setUp(self):
+        release = self.release = asyncio.Event()
+
+        class AdmittedSampleModelView(View):
+            serializer_class = CorrectSerializerThree
+            max_in_flight = 1
+            max_queued = 1
+            retry_after = 3
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+            async def list(self, request):
+                await release.wait()
+                return await super().list(request)
+
+        self.view_class = AdmittedSampleModelView
+
+    def test_overload_is_rejected_with_retry_after(self):
+        async def scenario():
+            requests = [asyncio.ensure_future(call_view(self.view_class)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            controller = self.view_class.admission_controller
+            gauges = controller.in_flight, controller.queued
+
+            rejected = await call_view(self.view_class)
+            self.release.set()
+
+            return gauges, rejected, await asyncio.gather(*requests)
+
+        with DBHandler():
+            gauges, rejected, responses = asyncio.get_event_loop().run_until_complete(scenario())
+
+            assert gauges == (1, 1)
+            assert rejected.status_code == 503
+            assert rejected.headers['retry-after'] == '3'
+            assert rejected.json() == {'detail': 'service unavailable'}
+            assert [response.status_code for response in responses] == [200, 200]
+            assert self.view_class.admission_controller.in_flight == 0
+
+    def test_shared_admission_controller(self):
+        controller = AdmissionController(max_in_flight=5)
+
+        class FirstView(View):
+            serializer_class = CorrectSerializerThree
+            admission_controller = controller
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+        class SecondView(FirstView):
+            serializer_class = CorrectSerializerThree
+            max_in_flight = 2
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+        assert FirstView.admission_controller is controller
+        assert SecondView.admission_controller is not controller
+        assert SampleModelView.admission_controller is None
+
+    def test_incorrect_admission_limits(self):
+        with self.assertRaises(ValueError):
+            class IncorrectAdmissionView(View):
+                serializer_class = CorrectSerializerThree
+                max_in_flight = 0
+
+                def get_queryset(self):
+                    return SampleModel.all()
+
+
+class TestViewPriorityLanes(unittest.TestCase):
+    def setUp(self):
+        release = self.release = asyncio.Event()
+
+        class LanedSampleModelView(View):
+            serializer_class = CorrectSerializerThree
+            priority_lanes = {
+                'list': PriorityLane('heavy', max_in_flight=1),
+                'instance': PriorityLane('point', max_in_flight=10),
+            }
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+            async def list(self, request):
+                await release.wait()
+                return await super().list(request)
+
+        self.view_class = LanedSampleModelView
+
+    def test_heavy_lane_does_not_block_point_reads(self):
+        async def scenario(pk):
+            heavy = asyncio.ensure_future(call_view(self.view_class))
+            await asyncio.sleep(0.01)
+            rejected = await call_view(self.view_class)
+            point = await call_view(self.view_class, path_params={'id': pk})
+            self.release.set()
+
+            return rejected, point, await heavy
+
+        with DBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(
+                SampleModel.get(name='model_1'))
+            rejected, point, heavy = asyncio.get_event_loop().run_until_complete(
+                scenario(sample_model.id))
+
+            assert rejected.status_code == 503
+            assert point.json() == {'id': sample_model.id, 'name': 'model_1'}
+            assert heavy.status_code == 200
+            assert self.view_class.priority_lanes['list'].rejected == 1
+            assert self.view_class.priority_lanes['list'].in_flight == 0
+
+    def test_priority_lane_connection(self):
+        class LaneConnectionView(View):
+            serializer_class = CorrectSerializerThree
+            priority_lanes = {
+                'list': PriorityLane('heavy', max_in_flight=1, connection='replica'),
+            }
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+        with RoutingDBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(
+                SampleModel.get(name='model_1'))
+            list_response = asyncio.get_event_loop().run_until_complete(
+                call_view(LaneConnectionView))
+            instance_response = asyncio.get_event_loop().run_until_complete(
+                call_view(LaneConnectionView, path_params={'id': sample_model.id}))
+
+            assert list_response.json() == []
+            assert instance_response.status_code == 200
+
+    def test_incorrect_priority_lanes(self):
+        with self.assertRaises(ValueError):
+            class UnknownActionLaneView(View):
+                serializer_class = CorrectSerializerThree
+                priority_lanes = {'export': PriorityLane('heavy', max_in_flight=1)}
+
+                def get_queryset(self):
+                    return SampleModel.all()
+
+        with self.assertRaises(ValueError):
+            class IncorrectLaneView(View):
+                serializer_class = CorrectSerializerThree
+                priority_lanes = {'list': 1}
+
+                def get_queryset(self):
+                    return SampleModel.all()
+
+
+class TestViewSync(unittest.TestCase):
+    EPOCH = '1970-01-01T00:00:00'
+
+    def call(self, *args, **kwargs):
+        return asyncio.get_event_loop().run_until_complete(
+            call_view(SampleSyncView, *args, **kwargs))
+
+    def sync(self, cursor, query_string=b''):
+        return self.call(query_string=b'&'.join(
+            part for part in (f'since={cursor}'.encode(), query_string) if part))
+
+    @staticmethod
+    def create_sync_models(*names):
+        async def create():
+            return [await SampleSyncModel.create(name=name) for name in names]
+
+        return asyncio.get_event_loop().run_until_complete(create())
+
+    def test_sync_not_acceptable_for_other_formats(self):
+        with DBHandler():
+            response = self.sync(self.EPOCH, b'format=columnar')
+
+            assert response.status_code == 406
+            assert response.json() == {'detail': 'not acceptable'}
+
+    def test_full_sync(self):
+        with DBHandler():
+            first, second = self.create_sync_models('first', 'second')
+            content = self.sync(self.EPOCH).json()
+
+            assert content['results'] == [{'id': first.id, 'name': 'first'},
+                                          {'id': second.id, 'name': 'second'}]
+            assert content['deleted'] == []
+            assert content['cursor'] == second.updated.isoformat()
+
+    def test_delta_sync(self):
+        with DBHandler():
+            first, second, third = self.create_sync_models('first', 'second', 'third')
+            cursor = self.sync(self.EPOCH).json()['cursor']
+
+            assert self.sync(cursor).json() == {'results': [], 'deleted': [], 'cursor': cursor}
+
+            first.name = 'first_changed'
+            asyncio.get_event_loop().run_until_complete(first.save())
+            assert self.call('DELETE', path_params={'id': second.id}).status_code == 200
+            content = self.sync(cursor).json()
+
+            assert content['results'] == [{'id': first.id, 'name': 'first_changed'}]
+            assert content['deleted'] == [second.id]
+            assert content['cursor'] > cursor
+            assert self.sync(content['cursor']).json()['results'] == []
+
+    def test_delta_sync_with_filters(self):
+        with DBHandler():
+            self.create_sync_models('first', 'second')
+            content = self.sync(self.EPOCH, b'name=second').json()
+
+            assert [row['name'] for row in content['results']] == ['second']
+
+    def test_delete_without_tombstone_model(self):
+        class PlainSyncView(View):
+            serializer_class = CorrectSerializerThree
+            sync_field = None
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+        with DBHandler():
+            sample_model = asyncio.get_event_loop().run_until_complete(
+                SampleModel.get(name='model_1'))
+            asyncio.get_event_loop().run_until_complete(
+                call_view(PlainSyncView, 'DELETE', path_params={'id': sample_model.id}))
+            tombstones = asyncio.get_event_loop().run_until_complete(
+                SampleTombstone.all().count())
+            response = asyncio.get_event_loop().run_until_complete(
+                call_view(PlainSyncView, query_string=b'since=2020-01-01'))
+
+            assert tombstones == 0
+            assert response.status_code == 400
+
+    def test_incorrect_cursor(self):
+        with DBHandler():
+            response = self.sync('yesterday')
+
+            assert response.status_code == 400
+            assert response.json() == {'detail': {'since': 'incorrect cursor'}}
+
+    def test_timezone_aware_cursor(self):
+        with DBHandler():
+            first, = self.create_sync_models('first')
+            cursor = (first.updated - datetime.timedelta(seconds=1)).isoformat()
+            content = self.sync(f'{cursor}%2B00:00').json()
+
+            assert [row['name'] for row in content['results']] == ['first']
+
+    def test_incorrect_sync_declaration(self):
+        with self.assertRaises(ValueError):
+            class IncorrectSyncFieldView(View):
+                serializer_class = SampleSyncSerializer
+                sync_field = 'name'
+
+                def get_queryset(self):
+                    return SampleSyncModel.all()
+
+        with self.assertRaises(ValueError):
+            class MissingSyncFieldView(View):
+                serializer_class = SampleSyncSerializer
+                tombstone_model = SampleTombstone
+
+                def get_queryset(self):
+                    return SampleSyncModel.all()
+
+
+class TestEventBroker(unittest.TestCase):
+    def run_async(self, coroutine):
+        return asyncio.get_event_loop().run_until_complete(coroutine)
+
+    def test_publish_to_model_subscribers(self):
+        async def scenario():
+            broker = EventBroker()
+            subscription = broker.subscribe('first')
+            other_subscription = broker.subscribe('second')
+            broker.publish('first', 'create', 1, {'id': 1})
+
+            assert await subscription.get() == {
+                'model': 'first', 'action': 'create', 'pk': 1, 'data': {'id': 1}}
+            assert other_subscription._queue.empty()
+            assert broker.subscribers() == 2
+            assert broker.subscribers('first') == 1
+
+            subscription.close()
+            assert broker.subscribers('first') == 0
+
+        self.run_async(scenario())
+
+    def test_drop_oldest(self):
+        async def scenario():
+            broker = EventBroker()
+            subscription = broker.subscribe('first', queue_size=2)
+            for pk in range(4):
+                broker.publish('first', 'update', pk, {})
+
+            assert [(await subscription.get())['pk'] for _ in range(2)] == [2, 3]
+            assert subscription.dropped == broker.stats['dropped'] == 2
+
+        self.run_async(scenario())
+
+    def test_drop_newest(self):
+        async def scenario():
+            broker = EventBroker()
+            subscription = broker.subscribe('first', queue_size=2, overflow_policy=DROP_NEWEST)
+            for pk in range(4):
+                broker.publish('first', 'update', pk, {})
+
+            assert [(await subscription.get())['pk'] for _ in range(2)] == [0, 1]
+            assert subscription.dropped == 2
+
+        self.run_async(scenario())
+
+    def test_disconnect_slow_subscriber(self):
+        async def scenario():
+            broker = EventBroker()
+            subscription = broker.subscribe('first', queue_size=1, overflow_policy=DISCONNECT)
+            for pk in range(3):
+                broker.publish('first', 'update', pk, {})
+
+            assert subscription.closed
+            assert [event['pk'] async for event in subscription] == [0]
+            assert broker.stats['disconnected'] == 1
+            assert broker.subscribers() == 0
+
+        self.run_async(scenario())
+
+    def test_incorrect_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            EventBroker().subscribe('first', overflow_policy='block')
+
+
+class TestViewEvents(unittest.TestCase):
+    def setUp(self):
+        broker = self.broker = EventBroker()
+
+        class EventsView(View):
+            serializer_class = SampleSyncSerializer
+            event_broker = broker
+
+            def get_queryset(self):
+                return SampleSyncModel.all()
+
+        class EventsStreamEndpoint(EventStreamEndpoint):
+            event_broker = broker
+            models = (SampleSyncModel,)
+            heartbeat_interval = 0.01
+
+        class EventsWebSocketEndpoint(EventWebSocketEndpoint):
+            event_broker = broker
+            models = (SampleSyncModel,)
+
+        self.view_class = EventsView
+        self.stream_endpoint = EventsStreamEndpoint
+        self.websocket_endpoint = EventsWebSocketEndpoint
+        self.model_name = get_model_name(SampleSyncModel)
+
+    def call(self, *args, **kwargs):
+        return asyncio.get_event_loop().run_until_complete(
+            call_view(self.view_class, *args, **kwargs))
+
+    def test_writes_publish_events(self):
+        with DBHandler():
+            subscription = self.broker.subscribe(self.model_name)
+            created = self.call('POST', body=json.dumps({'name': 'first'}).encode(),
+                                headers=(('content-type', 'application/json'),)).json()
+            self.call('PATCH', path_params={'id': created['id']},
+                      body=json.dumps({'name': 'changed'}).encode(),
+                      headers=(('content-type', 'application/json'),))
+            self.call('DELETE', path_params={'id': created['id']})
+
+            events = [asyncio.get_event_loop().run_until_complete(subscription.get())
+                      for _ in range(3)]
+
+            assert [(event['action'], event['pk']) for event in events] == [
+                ('create', created['id']), ('update', created['id']), ('delete', created['id'])]
+            assert events[0]['data'] == created
+            assert events[1]['data'] == {'id': created['id'], 'name': 'changed'}
+            assert events[2]['data'] == {'id': created['id'], 'name': 'changed'}
+
+    def test_event_stream_endpoint(self):
+        async def scenario():
+            stream = asyncio.ensure_future(call_view(
+                self.stream_endpoint, path_params={'model': self.model_name},
+                disconnect_delay=0.1))
+            while not self.broker.subscribers(self.model_name):
+                await asyncio.sleep(0.001)
+            self.broker.publish(self.model_name, 'create', 1, {'id': 1})
+
+            return await stream
+
+        response = asyncio.get_event_loop().run_until_complete(scenario())
+        body = response.body.decode()
+
+        assert response.headers['content-type'].startswith('text/event-stream')
+        assert 'event: create\ndata: {"model":"%s","action":"create","pk":1,' \
+               '"data":{"id":1}}\n\n' % self.model_name in body
+        assert ': ping\n\n' in body
+        assert self.broker.subscribers() == 0
+
+    def test_event_stream_unknown_model(self):
+        response = asyncio.get_event_loop().run_until_complete(
+            call_view(self.stream_endpoint, path_params={'model': 'unknown'}))
+
+        assert response.status_code == 404
+
+    def test_websocket_endpoint(self):
+        async def scenario():
+            disconnect = asyncio.Event()
+            messages = []
+            request_messages = [{'type': 'websocket.connect'}]
+
+            async def receive():
+                if request_messages:
+                    return request_messages.pop(0)
+
+                await disconnect.wait()
+                return {'type': 'websocket.disconnect', 'code': 1000}
+
+            async def send(message):
+                messages.append(message)
+                if message['type'] == 'websocket.send':
+                    disconnect.set()
+
+            scope = {'type': 'websocket', 'path': '/', 'headers': [], 'query_string': b'',
+                     'path_params': {'model': self.model_name}}
+            endpoint = asyncio.ensure_future(self.websocket_endpoint(scope, receive, send))
+            while not self.broker.subscribers(self.model_name):
+                await asyncio.sleep(0.001)
+            self.broker.publish(self.model_name, 'delete', 1, None)
+            await endpoint
+
+            return messages
+
+        messages = asyncio.get_event_loop().run_until_complete(scenario())
+
+        assert messages[0] == {'type': 'websocket.accept', 'subprotocol': None}
+        assert json.loads(messages[1]['text']) == {
+            'model': self.model_name, 'action': 'delete', 'pk': 1, 'data': None}
+        assert self.broker.subscribers() == 0
+
+
+class TestViewWriteCoalescer(unittest.TestCase):
+    def setUp(self):
+        class CoalescedSyncView(View):
+            serializer_class = SampleSyncSerializer
+            coalesce_writes = True
+            write_coalescer_window = 0.01
+
+            def get_queryset(self):
+                return SampleSyncModel.all()
+
+        class CoalescedChildView(View):
+            serializer_class = CorrectSerializerTwo
+            coalesce_writes = True
+            write_coalescer_window = 0.01
+
+            def get_queryset(self):
+                return SampleModelChild.all()
+
+        self.sync_view_class = CoalescedSyncView
+        self.child_view_class = CoalescedChildView
+
+    @staticmethod
+    def create_concurrently(view_class, payloads):
+        return asyncio.get_event_loop().run_until_complete(asyncio.gather(*[
+            call_view(view_class, 'POST', body=json.dumps(payload).encode(),
+                      headers=(('content-type', 'application/json'),))
+            for payload in payloads
+        ]))
+
+    def test_concurrent_creates_with_generated_pks(self):
+        with DBHandler():
+            responses = self.create_concurrently(
+                self.sync_view_class, [{'name': f'name_{index}'} for index in range(5)])
+            names = asyncio.get_event_loop().run_until_complete(
+                SampleSyncModel.all().order_by('id').values_list('id', 'name'))
+
+            assert [response.status_code for response in responses] == [201] * 5
+            assert [(row['id'], row['name']) for row in (r.json() for r in responses)] == names
+            assert self.sync_view_class.write_coalescer.batches == 1
+
+    def test_concurrent_creates_with_bulk_create(self):
+        with DBHandler():
+            payloads = [{'name': f'child_{index}', 'number': index, 'data': 'data',
+                         'sample_model': 'model_1'} for index in range(3)]
+            responses = self.create_concurrently(self.child_view_class, payloads)
+            count = asyncio.get_event_loop().run_until_complete(
+                SampleModelChild.filter(name__startswith='child_').count())
+
+            assert [response.json()['number'] for response in responses] == [0, 1, 2]
+            assert all(response.json()['sample_model'] == 'model_1' for response in responses)
+            assert count == 4 + 3
+            assert self.child_view_class.write_coalescer.batches == 1
+
+    def test_batch_is_flushed_when_full(self):
+        self.sync_view_class.write_coalescer = WriteCoalescer(
+            SampleSyncSerializer, window=10, max_batch_size=2)
+        with DBHandler():
+            responses = self.create_concurrently(
+                self.sync_view_class, [{'name': 'first'}, {'name': 'second'}])
+
+            assert [response.status_code for response in responses] == [201, 201]
+
+    def test_failed_batch_falls_back_to_single_saves(self):
+        async def save(self):
+            if self.validated_data['name'] == 'broken':
+                raise ValueError('broken')
+
+            return await Serializer.save(self)
+
+        async def bulk_save(*args, **kwargs):
+            return None
+
+        with DBHandler():
+            with mock.patch.object(SampleSyncSerializer, 'bulk_save', bulk_save), \
+                    mock.patch.object(SampleSyncSerializer, 'save', save):
+                coalescer = WriteCoalescer(SampleSyncSerializer, window=0.01)
+
+                async def scenario():
+                    serializers = [SampleSyncSerializer(data={'name': name})
+                                   for name in ('first', 'broken', 'second')]
+                    await asyncio.gather(*[serializer.is_valid() for serializer in serializers])
+
+                    return await asyncio.gather(
+                        *[coalescer.save(serializer) for serializer in serializers],
+                        return_exceptions=True)
+
+                first, broken, second = asyncio.get_event_loop().run_until_complete(scenario())
+
+            assert (first.name, second.name) == ('first', 'second')
+            assert isinstance(broken, ValueError)
+            assert coalescer.fallbacks == 1
+
+    def test_incorrect_coalescer_declaration(self):
+        with self.assertRaises(ValueError):
+            class IncorrectCoalescerView(View):
+                serializer_class = SampleSyncSerializer
+                write_coalescer_max_batch_size = 0
+
+                def get_queryset(self):
+                    return SampleSyncModel.all()
+
+
+class TestViewUpsert(unittest.TestCase):
+    CHILD_PK = 'a2f7d0c0-6bd6-4ab1-9cf0-0b1d5c4d3e2f'
+
+    def setUp(self):
+        class UpsertChildView(View):
+            serializer_class = CorrectSerializerTwo
+            allow_upsert = True
+
+            def get_queryset(self):
+                return SampleModelChild.all()
+
+        class UpsertSyncView(View):
+            serializer_class = SampleSyncSerializer
+            allow_upsert = True
+
+            def get_queryset(self):
+                return SampleSyncModel.all()
+
+        self.child_view_class = UpsertChildView
+        self.sync_view_class = UpsertSyncView
+
+    @staticmethod
+    def put(view_class, pk, payload):
+        return asyncio.get_event_loop().run_until_complete(
+            call_view(view_class, 'PUT', path_params={'id': pk},
+                      body=json.dumps(payload).encode(),
+                      headers=(('content-type', 'application/json'),)))
+
+    def test_upsert_creates_then_updates(self):
+        payload = {'name': 'first', 'number': 1, 'data': 'data', 'sample_model': 'model_1'}
+        with DBHandler():
+            created = self.put(self.child_view_class, self.CHILD_PK, payload)
+            updated = self.put(self.child_view_class, self.CHILD_PK, dict(payload, name='second'))
+            names = asyncio.get_event_loop().run_until_complete(
+                SampleModelChild.filter(id=self.CHILD_PK).values_list('name', flat=True))
+
+            assert (created.status_code, created.json()['id']) == (201, self.CHILD_PK)
+            assert (updated.status_code, updated.json()['name']) == (200, 'second')
+            assert names == ['second']
+
+    def test_upsert_does_not_create_generated_primary_keys(self):
+        with DBHandler():
+            sync_model = asyncio.get_event_loop().run_until_complete(
+                SampleSyncModel.create(name='first'))
+            updated = self.put(self.sync_view_class, str(sync_model.id), {'name': 'second'})
+            missing = self.put(self.sync_view_class, str(sync_model.id + 1), {'name': 'third'})
+            rows = asyncio.get_event_loop().run_until_complete(
+                SampleSyncModel.all().values_list('id', 'name'))
+
+            assert (updated.status_code, updated.json()) == (
+                200, {'id': sync_model.id, 'name': 'second'})
+            assert (missing.status_code, missing.json()) == (
+                404, {'detail': 'objects does not exists'})
+            assert rows == [(sync_model.id, 'second')]
+
+    def test_upsert_invalid_requests(self):
+        with DBHandler():
+            assert self.put(self.sync_view_class, 'abc', {'name': 'first'}).status_code == 400
+            assert self.put(self.sync_view_class, '42', {}).json() == {
+                'detail': 'invalid request for upsert'}
+            assert self.put(self.sync_view_class, '42', {'name': 'first', 'id': 1}).json() == {
+                'detail': {'id': 'primary key, cannot be in input'}}
+            assert asyncio.get_event_loop().run_until_complete(SampleSyncModel.all().count()) == 0
+
+    def test_upsert_is_opt_in(self):
+        with DBHandler():
+            assert self.put(SampleSyncView, '42', {'name': 'first'}).status_code == 405
+            assert ('PUT', 'instance') not in SampleSyncView.dispatch_table
+
+    def test_upsert_not_allowed_on_list_route(self):
+        with DBHandler():
+            response = asyncio.get_event_loop().run_until_complete(
+                call_view(self.sync_view_class, 'PUT', body=b'{"name": "first"}',
+                          headers=(('content-type', 'application/json'),)))
+
+            assert response.status_code == 405
+
+    @staticmethod
+    def upsert_group(pk, payload):
+        async def upsert():
+            serializer = CorrectSerializerFour(data=payload)
+            await serializer.is_valid()
+            created = await serializer.upsert(pk)
+            group = await SampleModelGroups.get_or_none(pk=pk)
+            names = sorted(await group.sample_models.all().values_list('name', flat=True)) \
+                if group else None
+
+            return created, group and group.name, names
+
+        return asyncio.get_event_loop().run_until_complete(upsert())
+
+    def test_upsert_replaces_many_to_many(self):
+        with DBHandler():
+            group = asyncio.get_event_loop().run_until_complete(
+                SampleModelGroups.get(name='group_1'))
+
+            assert self.upsert_group(group.pk, {
+                'name': 'updated', 'sample_models': ['model_3']}) == (
+                False, 'updated', ['model_3'])
+            assert self.upsert_group(100000, {
+                'name': 'created', 'sample_models': ['model_1', 'model_2']}) == (
+                None, None, None)
+
+    def test_upsert_rolls_back_on_many_to_many_failure(self):
+        async def _write_m2m_data(self, db, replace=False):
+            return False
+
+        with DBHandler():
+            group = asyncio.get_event_loop().run_until_complete(
+                SampleModelGroups.get(name='group_1'))
+            with mock.patch.object(CorrectSerializerFour, '_write_m2m_data', _write_m2m_data):
+                result = self.upsert_group(group.pk, {
+                    'name': 'updated', 'sample_models': ['model_3']})
+
+            assert result == (None, 'group_1', ['model_1', 'model_2'])
+
+    def test_upsert_query(self):
+        with DBHandler():
+            async def get_query():
+                serializer = CorrectSerializerTwo(data={
+                    'name': 'child', 'number': 1, 'data': 'data', 'sample_model': 'model_1'})
+                await serializer.is_valid()
+                instance = SampleModelChild(
+                    id='a2f7d0c0-6bd6-4ab1-9cf0-0b1d5c4d3e2f', **serializer.validated_data)
+
+                return serializer.get_upsert_query(instance)
+
+            query, values = asyncio.get_event_loop().run_until_complete(get_query())
+
+            assert query.startswith('INSERT INTO "samplemodelchild" ("id", ')
+            assert 'ON CONFLICT ("id") DO UPDATE SET ' in query
+            assert '"sample_model_id" = EXCLUDED."sample_model_id"' in query
+            assert '"created" = EXCLUDED' not in query
+            assert query.endswith('RETURNING *, (xmax = 0) AS "_upsert_created"')
+            assert len(values) == query.count('$')
+
+
+class TestViewBlobs(unittest.TestCase):
+    BLOB = bytes(range(256)) * 1024
+
+    @staticmethod
+    def get_child_pk(name='child_1'):
+        return asyncio.get_event_loop().run_until_complete(SampleModelChild.get(name=name)).pk
+
+    @staticmethod
+    def call_blob(method, pk, field='data', body=b'', headers=(),
+                  view_class=SampleModelChildBlobView):
+        return asyncio.get_event_loop().run_until_complete(
+            call_view(view_class, method, path_params={'id': str(pk), 'field': field},
+                      body=body, headers=headers))
+
+    def test_parse_range(self):
+        assert parse_range(None, 100) is None
+        assert parse_range('bytes=10-19', 100) == (10, 20)
+        assert parse_range('bytes=90-', 100) == (90, 100)
+        assert parse_range('bytes=-10', 100) == (90, 100)
+        assert parse_range('bytes=90-500', 100) == (90, 100)
+        assert parse_range('bytes=0-1,5-6', 100) is None
+        assert parse_range('items=0-1', 100) is None
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range('bytes=100-', 100)
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range('bytes=-0', 100)
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range('bytes=-5', 0)
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range('bytes=0-', 0)
+        assert parse_range('bytes=-', 100) is None
+
+    def test_upload_and_download(self):
+        with DBHandler():
+            pk = self.get_child_pk()
+            chunks = [self.BLOB[start:start + 10000] for start in range(0, len(self.BLOB), 10000)]
+            uploaded = self.call_blob('PUT', pk, body=chunks, headers=(
+                ('content-length', str(len(self.BLOB))),))
+            downloaded = self.call_blob('GET', pk)
+
+            assert (uploaded.status_code, uploaded.json()) == (200, {'size': len(self.BLOB)})
+            assert downloaded.status_code == 200
+            assert downloaded.body == self.BLOB
+            assert downloaded.headers['content-length'] == str(len(self.BLOB))
+            assert downloaded.headers['content-type'] == 'application/octet-stream'
+            body_chunks = [message['body'] for message in downloaded.messages
+                           if message['type'] == 'http.response.body' and message['body']]
+            assert len(body_chunks) == len(self.BLOB) // SampleModelChildBlobView.blob_chunk_size
+            assert all(type(chunk) is bytes for chunk in body_chunks)
+
+    def test_upload_without_content_length(self):
+        with DBHandler():
+            pk = self.get_child_pk()
+            uploaded = self.call_blob('PUT', pk, body=[b'\xff\x00', b'\x80'])
+
+            assert uploaded.json() == {'size': 3}
+            assert self.call_blob('GET', pk).body == b'\xff\x00\x80'
+
+    def test_download_range(self):
+        with DBHandler():
+            pk = self.get_child_pk()
+            self.call_blob('PUT', pk, body=self.BLOB)
+            response = self.call_blob('GET', pk, headers=(('range', 'bytes=10-19'),))
+            suffix = self.call_blob('GET', pk, headers=(('range', 'bytes=-5'),))
+            head = self.call_blob('HEAD', pk, headers=(('range', 'bytes=10-19'),))
+
+            assert response.status_code == 206
+            assert response.body == self.BLOB[10:20]
+            assert response.headers['content-range'] == f'bytes 10-19/{len(self.BLOB)}'
+            assert suffix.body == self.BLOB[-5:]
+            assert (head.status_code, head.body) == (206, b'')
+            assert head.headers['content-length'] == '10'
+
+    def test_download_range_not_satisfiable(self):
+        with DBHandler():
+            response = self.call_blob('GET', self.get_child_pk(), headers=(
+                ('range', 'bytes=5-'),))
+
+            assert response.status_code == 416
+            assert response.headers['content-range'] == 'bytes */1'
+
+            pk = self.get_child_pk('child_2')
+            self.call_blob('PUT', pk, body=b'', headers=(('content-length', '0'),))
+            empty = self.call_blob('GET', pk, headers=(('range', 'bytes=-5'),))
+
+            assert (empty.status_code, empty.headers['content-range']) == (416, 'bytes */0')
+
+    def test_unknown_blob_field_and_object(self):
+        with DBHandler():
+            pk = self.get_child_pk()
+
+            assert self.call_blob('GET', pk, field='name').status_code == 404
+            assert self.call_blob('PUT', pk, field='name', body=b'1').status_code == 404
+            assert self.call_blob('GET', 'unknown').status_code == 404
+
+    def test_upload_too_large(self):
+        class SmallBlobView(View):
+            serializer_class = SampleModelChildBlobSerializer
+            blob_max_size = 4
+
+            def get_queryset(self):
+                return SampleModelChild.all()
+
+        with DBHandler():
+            pk = self.get_child_pk()
+            declared = self.call_blob('PUT', pk, body=b'12345', view_class=SmallBlobView,
+                                      headers=(('content-length', '5'),))
+            streamed = self.call_blob('PUT', pk, body=[b'123', b'45'], view_class=SmallBlobView)
+
+            assert (declared.status_code, streamed.status_code) == (413, 413)
+            assert self.call_blob('GET', pk).body == b'1'
+
+    def test_upload_publishes_update_event(self):
+        broker = EventBroker()
+
+        class BlobEventsView(View):
+            serializer_class = CorrectSerializerTwo
+            event_broker = broker
+            blob_fields = ('data',)
+
+            def get_queryset(self):
+                return SampleModelChild.all()
+
+        with DBHandler():
+            pk = self.get_child_pk()
+            subscription = broker.subscribe(get_model_name(SampleModelChild))
+            self.call_blob('PUT', pk, body=b'uploaded', view_class=BlobEventsView)
+            event = asyncio.get_event_loop().run_until_complete(subscription.get())
+
+            assert (event['action'], event['pk']) == ('update', str(pk))
+            assert event['data']['data'] == 'uploaded'
+
+    def test_arbitrary_bytes_do_not_break_json_routes(self):
+        with DBHandler():
+            pk = self.get_child_pk()
+            self.call_blob('PUT', pk, body=b'\xff\xfe')
+            instance = asyncio.get_event_loop().run_until_complete(
+                call_view(SampleModelChildBlobView, path_params={'id': str(pk)}))
+            rows = asyncio.get_event_loop().run_until_complete(
+                call_view(SampleModelChildBlobView))
+
+            assert SampleModelChildBlobView.blob_field_names == {'data'}
+            assert instance.json() == {'id': str(pk), 'name': 'child_1', 'number': 1}
+            assert len(rows.json()) == 4
+            assert self.call_blob('GET', pk).body == b'\xff\xfe'
+
+    def test_serializer_binary_fields_are_not_exposed_by_default(self):
+        assert SampleModelChildView.blob_field_names == frozenset()
+
+    def test_upload_read_only_blob_field(self):
+        class ReadOnlyBlobSerializer(Serializer):
+            class Meta:
+                model = SampleModelChild
+                fields = ('id', 'name', 'data')
+                read_only_fields = ('data',)
+
+        class ReadOnlyBlobView(View):
+            serializer_class = ReadOnlyBlobSerializer
+            blob_fields = ('data',)
+
+            def get_queryset(self):
+                return SampleModelChild.all()
+
+        with DBHandler():
+            pk = self.get_child_pk()
+            response = self.call_blob('PUT', pk, body=b'changed', view_class=ReadOnlyBlobView)
+
+            assert response.status_code == 405
+            assert self.call_blob('GET', pk, view_class=ReadOnlyBlobView).body == b'1'
+
+    def test_incorrect_blob_fields_declaration(self):
+        with self.assertRaises(ValueError):
+            class IncorrectBlobView(View):
+                serializer_class = CorrectSerializerTwo
+                blob_fields = ('name',)
+
+                def get_queryset(self):
+                    return SampleModelChild.all()
+
+
+class TestViewAggregate(unittest.TestCase):
+    def setUp(self):
+        class AggregatedChildView(View):
+            serializer_class = CorrectSerializerTwo
+            filter_fields = {
+                'number': ('gte',),
+            }
+            ordering_fields = ('name',)
+            aggregate_fields = {
+                'number': ('sum', 'avg', 'max'),
+            }
+            group_by_fields = ('sample_model', 'name')
+
+            def get_queryset(self):
+                return SampleModelChild.all()
+
+        self.view_class = AggregatedChildView
+
+    def get(self, query_string):
+        return asyncio.get_event_loop().run_until_complete(
+            call_view(self.view_class, query_string=query_string))
+
+    def test_aggregate_group_by(self):
+        with DBHandler():
+            model_pks = asyncio.get_event_loop().run_until_complete(
+                SampleModel.all().order_by('id').values_list('id', flat=True))
+            with QueryCounter() as query_counter:
+                response = self.get(b'aggregate=count,sum:number,avg:number&group_by=sample_model')
+
+            assert response.status_code == 200
+            assert response.json() == [
+                {'sample_model': model_pks[0], 'count': 2, 'sum_number': 5, 'avg_number': 2.5},
+                {'sample_model': model_pks[1], 'count': 1, 'sum_number': 2, 'avg_number': 2},
+                {'sample_model': model_pks[2], 'count': 1, 'sum_number': 3, 'avg_number': 3},
+            ]
+            assert query_counter.count == 1
+            assert 'GROUP BY' in query_counter.queries[0]
+
+    def test_aggregate_without_group_by(self):
+        with DBHandler():
+            response = self.get(b'aggregate=count,max:number&number__gte=2&ordering=name')
+
+            assert response.json() == [{'count': 3, 'max_number': 4}]
+
+    def test_aggregate_errors(self):
+        with DBHandler():
+            assert self.get(b'aggregate=median:number').json() == {
+                'detail': {'aggregate': 'unknown aggregate function median'}}
+            assert self.get(b'aggregate=min:number').json() == {
+                'detail': {'aggregate': 'min:number aggregation not allowed'}}
+            assert self.get(b'aggregate=sum').json() == {
+                'detail': {'aggregate': 'sum requires field'}}
+            assert self.get(b'aggregate=').json() == {
+                'detail': {'aggregate': 'missing aggregate functions'}}
+            assert self.get(b'aggregate=count&group_by=number').json() == {
+                'detail': {'group_by': 'grouping not allowed'}}
+
+    def test_aggregate_params_are_not_reserved_by_default(self):
+        with DBHandler():
+            response = asyncio.get_event_loop().run_until_complete(
+                call_view(SampleModelView, query_string=b'aggregate=count'))
+
+            assert response.json() == {'detail': {'aggregate': 'filtering not allowed'}}
+
+    def test_incorrect_aggregate_declaration(self):
+        with self.assertRaises(ValueError):
+            class IncorrectAggregateView(View):
+                serializer_class = CorrectSerializerTwo
+                aggregate_fields = {'number': ('median',)}
+
+                def get_queryset(self):
+                    return SampleModelChild.all()
+
+        with self.assertRaises(ValueError):
+            class IncorrectGroupByView(View):
+                serializer_class = CorrectSerializerTwo
+                group_by_fields = ('ser_test',)
+
+                def get_queryset(self):
+                    return SampleModelChild.all()
+
+
+class TestViewMultiGet(unittest.TestCase):
+    @staticmethod
+    def get(view_class, query_string):
+        return asyncio.get_event_loop().run_until_complete(
+            call_view(view_class, query_string=query_string))
+
+    def test_multi_get_preserves_order(self):
+        with DBHandler():
+            pks = asyncio.get_event_loop().run_until_complete(
+                SampleModel.all().order_by('id').values_list('id', flat=True))
+            ids = [pks[2], 999999, pks[0], pks[2]]
+            query_string = f'ids={",".join(map(str, ids))},abc'.encode()
+            with QueryCounter() as query_counter:
+                response = self.get(SampleModelView, query_string)
+
+            assert response.status_code == 200
+            assert response.json() == {
+                'results': [{'id': pks[2], 'name': 'model_3'}, {'id': pks[0], 'name': 'model_1'}],
+                'missing': [999999, 'abc'],
+            }
+            assert query_counter.count == 1
+
+    def test_multi_get_applies_filters(self):
+        with DBHandler():
+            children = asyncio.get_event_loop().run_until_complete(
+                SampleModelChild.all().order_by('name'))
+            query_string = f'ids={children[1].pk},{children[0].pk}&name=child_1'.encode()
+            response = self.get(SampleModelChildView, query_string)
+
+            assert [row['name'] for row in response.json()['results']] == ['child_1']
+            assert response.json()['missing'] == [str(children[1].pk)]
+
+    def test_multi_get_bounds(self):
+        class SmallMultiGetView(View):
+            serializer_class = CorrectSerializerThree
+            max_ids = 2
+
+            def get_queryset(self):
+                return SampleModel.all()
+
+        with DBHandler():
+            expected = {'detail': {'ids': 'must contain from 1 to 2 ids'}}
+
+            assert self.get(SmallMultiGetView, b'ids=1,2,3').json() == expected
+            assert self.get(SmallMultiGetView, b'ids=,').json() == expected
+            assert self.get(SmallMultiGetView, b'ids=1,1').status_code == 200
+
+    def test_multi_get_not_acceptable_for_other_formats(self):
+        with DBHandler():
+            pk = asyncio.get_event_loop().run_until_complete(SampleModelChild.first()).pk
+            for query_format in ('columnar', 'ndjson', 'csv'):
+                response = self.get(SampleModelChildView,
+                                    f'ids={pk}&format={query_format}'.encode())
+
+                assert response.status_code == 406
+                assert response.json() == {'detail': 'not acceptable'}
+
+            response = self.get(SampleModelChildView, f'ids={pk}&format=json'.encode())
+
+            assert response.status_code == 200
+
+    def test_incorrect_max_ids_declaration(self):
+        with self.assertRaises(ValueError):
+            class IncorrectMultiGetView(View):
+                serializer_class = CorrectSerializerThree
+                max_ids = 0
+
+                def get_queryset(self):
+                    return SampleModel.all()
+
+
 if __name__ == '__main__':
     unittest.main()